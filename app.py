@@ -1,12 +1,27 @@
 from dotenv import load_dotenv
-from flask import Flask, flash, render_template, request, redirect, url_for, jsonify
+from flask import Flask, flash, render_template, request, redirect, url_for, jsonify, Response, stream_with_context, abort
 import os
+import json
+import click
+from functools import partial
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from supabase import create_client, Client
 from forms import CadastroForm, LoginForm, EsqueceuSenhaForm, RedefinirSenhaForm 
 from models import User
-from services.api_rawg import buscar_jogos_populares    
+from services.api_rawg import buscar_jogos_populares, buscar_detalhes_jogo
+from services.ia_gemini import gerar_arquivo_confidencial_stream
 from services.curiosidade_do_dia import get_curiosidade_diaria
+from services import agendador, limitador, cache
+from services.paginacao import buscar_pagina_agregada
+from services.explorar import pesquisar_tudo
+from services.lote import executar_lote
+from services.indice_catalogo import buscar_por_decada, buscar_por_ano
+from services.recomendacoes import recomendar, recomendar_varios
+from services.catalogo_idiomas import localizar, localizar_detalhes, normalizar_idioma
+from services.api_tmdb import IDIOMA_PADRAO
+from utils.cursor import codificar_cursor
+from utils.csv_handler import iniciar_importacao, estado_importacao, exportar_csv
+from utils import assets
 from services.api_tmdb import (
     buscar_filmes_populares, 
     buscar_series_populares, 
@@ -15,7 +30,9 @@ from services.api_tmdb import (
     buscar_catalogo_filmes, 
     buscar_catalogo_series, 
     buscar_filmes_por_genero,
-    buscar_series_por_genero
+    buscar_series_por_genero,
+    buscar_detalhes_filme,
+    buscar_detalhes_serie
 )
 import random
 
@@ -25,7 +42,20 @@ app = Flask(__name__)
 url: str = os.environ.get("SUPABASE_URL")
 key: str = os.environ.get("SUPABASE_KEY")
 supabase: Client = create_client(url, key)
+# O cliente acima guarda a sessão de quem entrou ou saiu por último, então o RLS recusa o que
+# roda fora da requisição do próprio usuário (importação em segundo plano e exportação).
+# Essas usam a chave service role, que ignora o RLS; o filtro por usuario_id fica no código.
+service_key: str = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+if service_key:
+    supabase_servico: Client = create_client(url, service_key)
+else:
+    print("Aviso: SUPABASE_SERVICE_ROLE_KEY não definida; importação e exportação usam a sessão compartilhada.")
+    supabase_servico = supabase
 app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY')
+# CSS/JS com hash no nome e pré-comprimidos, se `flask construir-assets` já tiver rodado
+assets.init_app(app)
+# Quantidade aproximada de itens devolvidos por cada "Ver mais" (junta várias páginas do TMDB)
+app.config['TAMANHO_PAGINA_API'] = int(os.environ.get('TAMANHO_PAGINA_API', 60))
 
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -33,6 +63,58 @@ login_manager.login_view = 'login'
 login_manager.login_message = "Faça login para continuar." 
 login_manager.login_message_category = "info" 
 
+# Agendador do cache: roda dentro do app só se AGENDADOR_ATIVO=1.
+# Também pode rodar separado com `flask aquecer-cache`.
+AGENDADOR_ATIVO = os.environ.get('AGENDADOR_ATIVO') == '1'
+_agendador_iniciado = False
+
+AVISO_CACHE_LOCAL = ("Com CACHE_BACKEND=memoria cada processo tem o próprio cache: só o processo que roda "
+                     "o agendador fica aquecido. Use CACHE_BACKEND=sqlite ou redis.")
+
+@app.before_request
+def iniciar_agendador():
+    # Sobe na primeira requisição, então só processos que servem o site rodam o agendador
+    # (comandos `flask` como construir-assets não). A trava deixa um só por máquina.
+    global _agendador_iniciado
+    if not AGENDADOR_ATIVO or _agendador_iniciado:
+        return
+    _agendador_iniciado = True
+    if not cache.compartilhado():
+        print(f"[agendador] Aviso: {AVISO_CACHE_LOCAL}")
+    agendador.iniciar_em_segundo_plano()
+
+@app.cli.command('aquecer-cache')
+@click.option('--uma-vez', is_flag=True, help='Atualiza tudo uma vez e sai, em vez de ficar agendando.')
+def aquecer_cache(uma_vez):
+    """Mantém as listas das APIs e a curiosidade do dia atualizadas antes de expirarem."""
+    if not cache.compartilhado():
+        # Rodando separado, o cache aquecido ficaria só neste processo e o app não o enxergaria
+        if not uma_vez:
+            raise click.ClickException(AVISO_CACHE_LOCAL)
+        click.echo(f"Aviso: {AVISO_CACHE_LOCAL}")
+
+    if uma_vez:
+        estatisticas = agendador.aquecer_tudo()
+        total = sum(item['duracao'] for item in estatisticas.values())
+        falhas = [nome for nome, item in estatisticas.items() if not item['ok']]
+        click.echo(f"{len(estatisticas)} tarefas em {total:.2f}s ({len(falhas)} falhas)")
+        for nome in falhas:
+            click.echo(f"  falhou: {nome}")
+        for api, uso in limitador.metricas().items():
+            click.echo(f"  {api}: {uso['requisicoes']} requisições, {uso['respostas_429']} respostas 429, "
+                       f"{uso['rejeitadas']} rejeitadas, {uso['tempo_espera']}s esperando")
+    else:
+        agendador.executar_com_trava()
+
+@app.cli.command('construir-assets')
+def construir_assets():
+    """Minifica, gera nomes com hash e pré-comprime (gzip/brotli) o CSS e o JS em static/dist."""
+    manifest = assets.construir(app.static_folder)
+    for original, versao in sorted(manifest.items()):
+        click.echo(f"{original} -> {versao}")
+    if not assets.brotli:
+        click.echo("Aviso: pacote 'brotli' não instalado, gerando só .gz")
+
 @login_manager.user_loader
 def load_user(user_id):
     try:
@@ -54,16 +136,28 @@ def load_user(user_id):
         
     return None
 
+def _idioma_atual():
+    """Idioma escolhido com ?idioma= (lembrado em cookie). Sem escolha, pt-BR."""
+    return normalizar_idioma(request.args.get('idioma') or request.cookies.get('idioma'))
+
+@app.after_request
+def lembrar_idioma(response):
+    if 'idioma' in request.args:
+        response.set_cookie('idioma', _idioma_atual(), max_age=365 * 24 * 60 * 60, samesite='Lax')
+    return response
+
 @app.route('/')
 def index():
+    idioma = _idioma_atual()
+
     # Buscando dados das APIs
-    filmes_populares = buscar_filmes_populares()
-    series_populares = buscar_series_populares()
+    filmes_populares = localizar(buscar_filmes_populares, idioma)
+    series_populares = localizar(buscar_series_populares, idioma)
     jogos_populares = buscar_jogos_populares() 
     
     # Buscando as novas categorias
-    filmes_classicos = buscar_filmes_classicos()
-    series_nostalgia = buscar_series_nostalgia()
+    filmes_classicos = localizar(buscar_filmes_classicos, idioma)
+    series_nostalgia = localizar(buscar_series_nostalgia, idioma)
 
     # Lógica original restaurada (Cache + Curiosidade do Dia)
     curiosidade = get_curiosidade_diaria()
@@ -203,62 +297,258 @@ def criar_arquivo():
 def meus_arquivos():
     return "<h1>Meus Arquivos</h1><p>Lista dos arquivos que você criou.</p>"
 
+@app.route('/meus-arquivos/importar', methods=['POST'])
+@login_required
+def importar_arquivos():
+    """
+    Recebe uma planilha CSV (titulo, tipo, ano, comentario) e importa em segundo plano.
+    Responde na hora (202) com o ID e a URL para acompanhar o andamento.
+    """
+    arquivo = request.files.get('arquivo')
+    if not arquivo or not arquivo.filename:
+        return jsonify({'erro': 'Envie um arquivo CSV.'}), 400
+
+    try:
+        id_importacao = iniciar_importacao(supabase_servico, current_user.id, arquivo.stream)
+    except Exception as e:
+        print(f"Erro ao importar CSV: {e}")
+        return jsonify({'erro': 'Não foi possível importar o arquivo.'}), 500
+
+    return jsonify({
+        'id': id_importacao,
+        'status': 'processando',
+        'andamento': url_for('andamento_importacao', id_importacao=id_importacao)
+    }), 202
+
+@app.route('/meus-arquivos/importar/<id_importacao>')
+@login_required
+def andamento_importacao(id_importacao):
+    """Andamento de uma importação: status, linhas lidas, importados e não encontrados."""
+    estado = estado_importacao(id_importacao, current_user.id)
+    if estado is None:
+        return jsonify({'erro': 'Importação não encontrada.'}), 404
+    return jsonify(estado)
+
+@app.route('/meus-arquivos/exportar')
+@login_required
+def exportar_arquivos():
+    """Baixa o arquivo do usuário em CSV, gerado em streaming."""
+    return Response(
+        stream_with_context(exportar_csv(supabase_servico, current_user.id)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=arquivo_nostalgia.csv'}
+    )
+
+def _responder_catalogo(funcao_catalogo, funcao_genero=None, generos=''):
+    """
+    Resposta comum das APIs de catálogo.
+    Com o parâmetro `cursor`, junta várias páginas do TMDB sem repetir itens já enviados
+    e devolve {'itens': [...], 'cursor': token}. Sem ele, mantém o formato antigo (lista de uma página).
+    """
+    if generos:
+        funcao, extras = funcao_genero, {'generos': generos}
+    else:
+        funcao, extras = funcao_catalogo, {}
+
+    idioma = _idioma_atual()
+    if idioma != IDIOMA_PADRAO:
+        funcao = partial(localizar, funcao, idioma)
+
+    if 'cursor' in request.args:
+        itens, cursor = buscar_pagina_agregada(
+            funcao,
+            request.args.get('cursor', ''),
+            app.config['TAMANHO_PAGINA_API'],
+            **extras
+        )
+        return jsonify({'itens': itens, 'cursor': cursor})
+
+    pagina = request.args.get('pagina', 1, type=int)
+    return jsonify(funcao(pagina=pagina, **extras))
+
+def _cursor_inicial(itens):
+    """Cursor para continuar depois da primeira página renderizada no servidor."""
+    return codificar_cursor(2, [item['id'] for item in itens])
+
 @app.route('/filmes')
 def filmes():
-    lista_filmes = buscar_catalogo_filmes(pagina=1)
-    return render_template('conteudo/filmes.html', filmes=lista_filmes)
+    lista_filmes = localizar(buscar_catalogo_filmes, _idioma_atual(), pagina=1)
+    return render_template('conteudo/filmes.html', filmes=lista_filmes, cursor=_cursor_inicial(lista_filmes))
 
 @app.route('/api/filmes')
 def api_filmes():
     """API que retorna filmes populares em JSON para o botão 'Ver mais'."""
-    pagina = request.args.get('pagina', 1, type=int)
-    lista_filmes = buscar_catalogo_filmes(pagina=pagina)
-    return jsonify(lista_filmes)
+    return _responder_catalogo(buscar_catalogo_filmes)
 
 @app.route('/api/filmes/filtrar')
 def api_filmes_filtrar():
     """API que retorna filmes filtrados por gênero."""
-    generos = request.args.get('generos', '')  
-    pagina = request.args.get('pagina', 1, type=int)
-    
-    if generos:
-        lista_filmes = buscar_filmes_por_genero(generos=generos, pagina=pagina)
-    else:
-        # Se nenhum gênero selecionado, retorna populares
-        lista_filmes = buscar_catalogo_filmes(pagina=pagina)
-    
-    return jsonify(lista_filmes)
+    generos = request.args.get('generos', '')
+    # Se nenhum gênero selecionado, retorna populares
+    return _responder_catalogo(buscar_catalogo_filmes, buscar_filmes_por_genero, generos)
 
 # Rotas provisórias para os links do menu não quebrarem a página
 @app.route('/series')
 def series():
-    lista_series = buscar_catalogo_series(pagina=1)
-    return render_template('conteudo/series.html', series=lista_series)
+    lista_series = localizar(buscar_catalogo_series, _idioma_atual(), pagina=1)
+    return render_template('conteudo/series.html', series=lista_series, cursor=_cursor_inicial(lista_series))
 
 @app.route('/api/series')
 def api_series():
     """API que retorna séries populares em JSON para o botão 'Ver mais'."""
-    pagina = request.args.get('pagina', 1, type=int)
-    lista_series = buscar_catalogo_series(pagina=pagina)
-    return jsonify(lista_series)
+    return _responder_catalogo(buscar_catalogo_series)
 
 @app.route('/api/series/filtrar')
 def api_series_filtrar():
     """API que retorna séries filtradas por gênero."""
     generos = request.args.get('generos', '')
-    pagina = request.args.get('pagina', 1, type=int)
-    
-    if generos:
-        lista_series = buscar_series_por_genero(generos=generos, pagina=pagina)
-    else:
-        lista_series = buscar_catalogo_series(pagina=pagina)
-    
-    return jsonify(lista_series)
+    return _responder_catalogo(buscar_catalogo_series, buscar_series_por_genero, generos)
 
 @app.route('/jogos')
 def jogos():
     return render_template('conteudo/jogos.html') 
 
+@app.route('/api/decadas/<int:decada>')
+def api_decada(decada):
+    """
+    Títulos de uma década (ou de um ano, com ?ano=) vindos do índice local, sem chamar as APIs.
+    Filtros opcionais: tipos=movie,tv,game, nota_minima=7, limite=40, ordenar=nota|data.
+    """
+    tipos = [tipo for tipo in request.args.get('tipos', '').split(',') if tipo] or None
+    filtros = {
+        'tipos': tipos,
+        'nota_minima': request.args.get('nota_minima', type=float),
+        'limite': max(1, min(request.args.get('limite', 40, type=int), 200)),
+        'ordenar': request.args.get('ordenar', 'nota'),
+    }
+
+    ano = request.args.get('ano', type=int)
+    if ano:
+        return jsonify(buscar_por_ano(ano, **filtros))
+    return jsonify(buscar_por_decada(decada - decada % 10, **filtros))
+
+@app.route('/api/recomendacoes/<tipo>/<int:id_item>')
+def api_recomendacoes(tipo, id_item):
+    """Títulos parecidos com um filme, série ou jogo. ?tipos=game traz só jogos (filme -> jogo)."""
+    tipos = [t for t in request.args.get('tipos', '').split(',') if t] or None
+    k = max(1, min(request.args.get('k', 12, type=int), 50))
+    return jsonify(recomendar(tipo, id_item, k, tipos))
+
+@app.route('/api/recomendacoes')
+def api_recomendacoes_lote():
+    """
+    Recomendações de vários títulos numa chamada só, para páginas de lista.
+    Ex: /api/recomendacoes?itens=movie:603,tv:1396&k=6
+    """
+    chaves = []
+    for valor in request.args.get('itens', '').split(','):
+        tipo, _, id_item = valor.partition(':')
+        if tipo and id_item.isdigit():
+            chaves.append((tipo, int(id_item)))
+
+    tipos = [t for t in request.args.get('tipos', '').split(',') if t] or None
+    k = max(1, min(request.args.get('k', 6, type=int), 50))
+    resultado = recomendar_varios(chaves[:100], k, tipos)
+    return jsonify({f"{tipo}:{id_item}": itens for (tipo, id_item), itens in resultado.items()})
+
+# Tipo da mídia -> (função de detalhes, nome usado no prompt do Gemini)
+DETALHES_POR_TIPO = {
+    'movie': (buscar_detalhes_filme, 'filme'),
+    'tv': (buscar_detalhes_serie, 'série'),
+    'game': (buscar_detalhes_jogo, 'jogo'),
+}
+
+@app.route('/detalhes/<tipo>/<int:id_midia>')
+def detalhes(tipo, id_midia):
+    """Página de detalhes. A curiosidade do Gemini chega depois, por SSE, sem atrasar a página."""
+    if tipo not in DETALHES_POR_TIPO:
+        abort(404)
+
+    buscar_detalhes, nome_tipo = DETALHES_POR_TIPO[tipo]
+    if tipo == 'game':
+        # A RAWG não tem traduções
+        midia = buscar_detalhes(id_midia)
+    else:
+        midia = localizar_detalhes(buscar_detalhes, id_midia, _idioma_atual())
+    if not midia:
+        abort(404)
+
+    return render_template(
+        'conteudo/detalhes.html',
+        midia=midia,
+        nome_tipo=nome_tipo,
+        recomendacoes=recomendar(tipo, id_midia, k=12)
+    )
+
+@app.route('/api/curiosidade/stream/<tipo>/<int:id_midia>')
+def api_curiosidade_stream(tipo, id_midia):
+    """
+    Server-sent events com a curiosidade de um filme, série ou jogo, repassando o texto do Gemini
+    conforme ele é gerado. O título vem dos detalhes da mídia (em cache), nunca do cliente.
+    Eventos: 'data' com cada pedaço (JSON) e 'fim' ao terminar.
+    """
+    if tipo not in DETALHES_POR_TIPO:
+        abort(404)
+
+    buscar_detalhes, nome_tipo = DETALHES_POR_TIPO[tipo]
+    midia = buscar_detalhes(id_midia)
+    if not midia:
+        abort(404)
+
+    def gerar():
+        for pedaco in gerar_arquivo_confidencial_stream(midia['titulo'], nome_tipo, id_midia):
+            yield f"data: {json.dumps(pedaco, ensure_ascii=False)}\n\n"
+        yield "event: fim\ndata: {}\n\n"
+
+    return Response(
+        stream_with_context(gerar()),
+        mimetype='text/event-stream',
+        headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'}
+    )
+
+@app.route('/api/lote', methods=['POST'])
+def api_lote():
+    """
+    Várias listas numa requisição só. Corpo JSON:
+        {"consultas": [{"id": "populares", "tipo": "filmes_populares", "pagina": 2},
+                       {"id": "acao", "tipo": "filmes_genero", "generos": "28"}]}
+    Resposta: {"resultados": {"populares": [...], "acao": [...]}, "erros": {}}
+    """
+    dados = request.get_json(silent=True) or {}
+    consultas = dados.get('consultas') if isinstance(dados, dict) else dados
+    if not isinstance(consultas, list) or not consultas:
+        return jsonify({'erro': 'Envie uma lista de consultas.'}), 400
+
+    return jsonify(executar_lote(consultas, _idioma_atual()))
+
+@app.route('/explorar')
+def explorar():
+    return render_template('conteudo/explorar.html', query=request.args.get('q', ''))
+
+@app.route('/api/explorar')
+def api_explorar():
+    """
+    Busca filmes, séries e jogos ao mesmo tempo e devolve em NDJSON (um JSON por linha),
+    enviando cada fonte assim que ela responde.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'erro': 'Informe o termo da busca.'}), 400
+
+    def gerar():
+        total = 0
+        for bloco in pesquisar_tudo(query):
+            total += len(bloco['itens'])
+            yield json.dumps(bloco, ensure_ascii=False) + '\n'
+        yield json.dumps({'fim': True, 'total': total}) + '\n'
+
+    return Response(
+        stream_with_context(gerar()),
+        mimetype='application/x-ndjson',
+        # Evita que proxies segurem a resposta até o fim
+        headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'}
+    )
+
 # lembrar de tirar parte do debug ao final do projeto 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -2,7 +2,8 @@ from .api_tmdb import (
     buscar_filmes_populares, 
     buscar_series_populares, 
     pesquisar_midia, 
-    buscar_detalhes_filme
+    buscar_detalhes_filme,
+    buscar_detalhes_serie
 )
 
 from .api_rawg import (
@@ -11,4 +12,4 @@ from .api_rawg import (
     buscar_detalhes_jogo
 )
 
-from .ia_gemini import gerar_arquivo_confidencial
\ No newline at end of file
+from .ia_gemini import gerar_arquivo_confidencial, gerar_arquivo_confidencial_stream
\ No newline at end of file
@@ -0,0 +1,253 @@
+"""
+Agendador que mantém o cache das APIs sempre quente.
+
+Em vez de deixar o primeiro usuário depois da expiração pagar pela chamada ao TMDB/RAWG,
+o agendador atualiza cada lista um pouco antes de ela expirar (com um atraso aleatório
+para que as tarefas não disparem todas juntas) e gera a curiosidade do dia seguinte
+antes da meia-noite.
+
+Pode rodar dentro do app (thread em segundo plano, ativada com AGENDADOR_ATIVO=1)
+ou separado, pelo comando `flask aquecer-cache`. Nos dois casos uma trava de arquivo
+garante um único agendador por máquina, mesmo com vários workers do gunicorn.
+Rodando separado, o cache precisa ser compartilhado (CACHE_BACKEND=sqlite ou redis).
+"""
+import os
+import time
+import random
+import threading
+from datetime import datetime, timedelta
+
+from services.api_tmdb import (
+    buscar_filmes_populares,
+    buscar_series_populares,
+    buscar_filmes_classicos,
+    buscar_series_nostalgia,
+    buscar_catalogo_filmes,
+    buscar_catalogo_series,
+    buscar_filmes_por_genero,
+    buscar_series_por_genero,
+    buscar_por_periodo
+)
+from services.api_rawg import buscar_jogos_populares, buscar_jogos_por_periodo
+from services import cache, indice_catalogo
+from services.curiosidade_do_dia import get_curiosidade_diaria, pre_gerar_curiosidade
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos (só para desenvolvimento)
+    fcntl = None
+
+ARQUIVO_TRAVA = os.environ.get('AGENDADOR_TRAVA') or cache.caminho_instancia('agendador.lock')
+
+# Quantas páginas do catálogo manter quentes (as primeiras são as mais acessadas)
+PAGINAS_AQUECIDAS = int(os.environ.get('AGENDADOR_PAGINAS', 2))
+
+# Fração do TTL em que a atualização acontece (0.8 = quando faltam 20% para expirar)
+FRACAO_TTL = 0.8
+
+# Variação aleatória aplicada a cada agendamento (fração do TTL)
+JITTER = 0.1
+
+# Intervalo, em segundos, entre as verificações do laço principal
+INTERVALO_VERIFICACAO = 15
+
+# Minutos antes da meia-noite em que a curiosidade do dia seguinte é gerada
+MINUTOS_ANTES_MEIA_NOITE = 15
+
+# Décadas mantidas no índice local (seções "anos 90", "anos 2000"...)
+DECADAS = [1970, 1980, 1990, 2000, 2010]
+PAGINAS_POR_DECADA = 2
+
+# Mesmos gêneros dos filtros de templates/conteudo/filmes.html e series.html
+GENEROS_FILMES = ['16', '12', '28', '10770', '35', '80', '99', '18', '10751', '14',
+                  '37', '878', '10752', '36', '9648', '10402', '10749', '27', '53']
+GENEROS_SERIES = ['10765', '16', '35', '80', '99', '18', '10751', '37', '10762',
+                  '9648', '10763', '10764', '10767', '10766', '10759', '10768']
+
+# Tempo da última atualização de cada tarefa: {nome: {'duracao': s, 'ok': bool, 'quando': datetime}}
+estatisticas = {}
+
+class _Tarefa:
+    """Uma função de serviço com cache e os argumentos que devem ser mantidos quentes."""
+
+    def __init__(self, nome, funcao, *args, **kwargs):
+        self.nome = nome
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        # Espalha a primeira execução para não disparar tudo no mesmo segundo
+        self.proxima_execucao = time.time() + random.uniform(0, INTERVALO_VERIFICACAO)
+
+    def reagendar(self):
+        """Agenda a próxima execução para pouco antes do valor expirar."""
+        ttl = self.funcao.ttl
+        expira_em = self.funcao.expira_em(*self.args, **self.kwargs) or time.time() + ttl
+        antecedencia = ttl * (1 - FRACAO_TTL) + random.uniform(0, ttl * JITTER)
+        self.proxima_execucao = max(expira_em - antecedencia, time.time() + INTERVALO_VERIFICACAO)
+
+    def executar(self):
+        inicio = time.perf_counter()
+        try:
+            ok = bool(self.funcao.atualizar(*self.args, **self.kwargs))
+            # Resultado que o cache recusou (ex: jogos ainda com capa provisória) conta como falha:
+            # reagendar pelo TTL deixaria os usuários indo à API até lá
+            ok = ok and self.funcao.expira_em(*self.args, **self.kwargs) is not None
+        except Exception as e:
+            print(f"[agendador] Erro ao atualizar '{self.nome}': {e}")
+            ok = False
+        _registrar(self.nome, inicio, ok)
+
+        if ok:
+            self.reagendar()
+        else:
+            # Se a API falhou ou o resultado não foi guardado, tenta de novo em breve
+            self.proxima_execucao = time.time() + INTERVALO_VERIFICACAO * random.uniform(2, 4)
+
+def _registrar(nome, inicio, ok):
+    duracao = time.perf_counter() - inicio
+    estatisticas[nome] = {'duracao': round(duracao, 3), 'ok': ok, 'quando': datetime.now()}
+    status = "ok" if ok else "falhou"
+    print(f"[agendador] {nome}: {status} em {duracao:.2f}s")
+
+def montar_tarefas():
+    """Lista de tudo que o agendador mantém quente."""
+    tarefas = [
+        _Tarefa('filmes_populares', buscar_filmes_populares, pagina=1),
+        _Tarefa('series_populares', buscar_series_populares, pagina=1),
+        _Tarefa('jogos_populares', buscar_jogos_populares),
+        _Tarefa('filmes_classicos', buscar_filmes_classicos, pagina=1),
+        _Tarefa('series_nostalgia', buscar_series_nostalgia, pagina=1),
+    ]
+
+    for pagina in range(1, PAGINAS_AQUECIDAS + 1):
+        tarefas.append(_Tarefa(f'catalogo_filmes[{pagina}]', buscar_catalogo_filmes, pagina=pagina))
+        tarefas.append(_Tarefa(f'catalogo_series[{pagina}]', buscar_catalogo_series, pagina=pagina))
+
+    for genero in GENEROS_FILMES:
+        tarefas.append(_Tarefa(f'filmes_genero[{genero}]', buscar_filmes_por_genero, generos=genero, pagina=1))
+    for genero in GENEROS_SERIES:
+        tarefas.append(_Tarefa(f'series_genero[{genero}]', buscar_series_por_genero, generos=genero, pagina=1))
+
+    for decada in DECADAS:
+        for pagina in range(1, PAGINAS_POR_DECADA + 1):
+            tarefas.append(_Tarefa(f'filmes_decada[{decada}:{pagina}]', buscar_por_periodo, 'movie', decada, decada + 9, pagina=pagina))
+            tarefas.append(_Tarefa(f'series_decada[{decada}:{pagina}]', buscar_por_periodo, 'tv', decada, decada + 9, pagina=pagina))
+        tarefas.append(_Tarefa(f'jogos_decada[{decada}]', buscar_jogos_por_periodo, decada, decada + 9))
+
+    return tarefas
+
+def _salvar_indice():
+    """Publica o índice de décadas para os workers do app."""
+    try:
+        if indice_catalogo.indice.salvar():
+            print(f"[agendador] índice do catálogo salvo ({len(indice_catalogo.indice)} títulos)")
+    except Exception as e:
+        print(f"[agendador] Erro ao salvar índice do catálogo: {e}")
+
+def _proxima_pre_geracao(acabou_de_gerar=False):
+    """Horário (timestamp) em que a curiosidade de amanhã deve ser gerada."""
+    agora = datetime.now()
+    meia_noite = datetime.combine(agora.date() + timedelta(days=1), datetime.min.time())
+    horario = meia_noite - timedelta(minutes=MINUTOS_ANTES_MEIA_NOITE + random.uniform(0, 5))
+    if horario <= agora:
+        # Já passou do horário: se a de amanhã ainda não foi gerada, gera agora
+        if not acabou_de_gerar:
+            return agora.timestamp()
+        horario += timedelta(days=1)
+    return horario.timestamp()
+
+def _executar_curiosidade(pre_gerar):
+    inicio = time.perf_counter()
+    if pre_gerar:
+        ok = pre_gerar_curiosidade() is not None
+        _registrar('curiosidade_amanha', inicio, ok)
+    else:
+        ok = get_curiosidade_diaria() is not None
+        _registrar('curiosidade_hoje', inicio, ok)
+    return ok
+
+def aquecer_tudo():
+    """Atualiza todas as listas e a curiosidade do dia uma única vez. Retorna as estatísticas."""
+    for tarefa in montar_tarefas():
+        tarefa.executar()
+    _executar_curiosidade(pre_gerar=False)
+    _salvar_indice()
+    return estatisticas
+
+def executar(parar=None):
+    """
+    Laço principal do agendador. Roda até `parar` (threading.Event) ser sinalizado.
+    """
+    parar = parar or threading.Event()
+    tarefas = montar_tarefas()
+
+    # Garante que a curiosidade de hoje exista logo na subida
+    _executar_curiosidade(pre_gerar=False)
+    proxima_curiosidade = _proxima_pre_geracao()
+
+    while not parar.is_set():
+        agora = time.time()
+
+        for tarefa in tarefas:
+            if tarefa.proxima_execucao <= agora:
+                tarefa.executar()
+
+        if proxima_curiosidade <= agora:
+            if _executar_curiosidade(pre_gerar=True):
+                proxima_curiosidade = _proxima_pre_geracao(acabou_de_gerar=True)
+            else:
+                proxima_curiosidade = agora + INTERVALO_VERIFICACAO * 4
+
+        _salvar_indice()
+        parar.wait(INTERVALO_VERIFICACAO)
+
+def _adquirir_trava():
+    """
+    Tenta a trava exclusiva do agendador sem esperar. Retorna o arquivo aberto (que mantém
+    a trava enquanto estiver aberto) ou None se outro processo já estiver com ela.
+    """
+    arquivo = open(ARQUIVO_TRAVA, 'a')
+    if fcntl is None:
+        return arquivo
+    try:
+        fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        arquivo.close()
+        return None
+    return arquivo
+
+def executar_com_trava(parar=None):
+    """
+    Roda o agendador só se nenhum outro processo estiver rodando. Se estiver, fica
+    tentando de tempos em tempos (assume o lugar se aquele processo morrer).
+    """
+    parar = parar or threading.Event()
+    avisou = False
+    while not parar.is_set():
+        trava = _adquirir_trava()
+        if trava:
+            try:
+                executar(parar)
+            finally:
+                trava.close()
+            return
+        if not avisou:
+            print(f"[agendador] outro processo já está com a trava ({ARQUIVO_TRAVA}); aguardando")
+            avisou = True
+        parar.wait(INTERVALO_VERIFICACAO * 4)
+
+_lock_inicio = threading.Lock()
+_parar = None
+
+def iniciar_em_segundo_plano():
+    """
+    Inicia o agendador numa thread daemon dentro do próprio app (uma vez por processo).
+    Entre os workers, só o que pegar a trava atualiza o cache; os outros ficam de reserva.
+    """
+    global _parar
+    with _lock_inicio:
+        if _parar is None:
+            _parar = threading.Event()
+            thread = threading.Thread(target=executar_com_trava, args=(_parar,), name='agendador-cache', daemon=True)
+            thread.start()
+    return _parar
@@ -1,40 +1,91 @@
 import os
 import requests
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from services import cache
+from services.cache import cache_resultado
+from services.limitador import requisitar, LimiteExcedido
+from services.indice_catalogo import indexar
 
 load_dotenv()
 
 RAWG_API_KEY = os.environ.get('RAWG_API_KEY')
 BASE_URL = "https://api.rawg.io/api"
 
-_steam_id_cache = {}
+TTL_JOGOS_POPULARES = 30 * 60  # Segundos que a lista de populares fica em cache
+TTL_PESQUISA = 60 * 60
+TTL_PERIODO = 24 * 60 * 60
+TTL_STEAM_ID = 7 * 24 * 60 * 60  # O AppID de um jogo praticamente nunca muda
+TTL_STEAM_SEM_ID = 24 * 60 * 60  # Jogo que a busca da Steam não encontrou
+TTL_DETALHES = 6 * 60 * 60  # Inclui o preço da Steam, que muda com promoções
+
+# A Steam permite ~200 buscas a cada 5 minutos: numa lista de 25 jogos, as que não couberem
+# no limite na hora são feitas aqui, uma de cada vez, e a lista não vai para o cache até
+# todas as capas estarem resolvidas
+MAX_FILA_STEAM = 200
+ESPERA_STEAM_SEGUNDO_PLANO = 60
+_BUSCA_ADIADA = object()
+_fila_steam = set()
+_lock_fila_steam = threading.Lock()
+_executor_steam = ThreadPoolExecutor(max_workers=1, thread_name_prefix='steam')
+
+def _consultar_id_steam(nome_jogo, timeout, espera_maxima):
+    """
+    Busca o AppID na API de busca da Steam e guarda no cache, inclusive quando não encontra.
+    Levanta LimiteExcedido se não houver token dentro de `espera_maxima`.
+    """
+    url = f"https://store.steampowered.com/api/storesearch/?term={nome_jogo}&l=english&cc=US"
+    response = requisitar('steam', url, timeout=timeout, espera_maxima=espera_maxima)
+    data = response.json()
+
+    steam_id = None
+    if data and (data.get('total') or 0) > 0:
+        items = data.get('items', [])
+        if items:
+            # Pega o primeiro resultado
+            steam_id = str(items[0]['id'])
+
+    # '' marca "não está na Steam" para não buscar de novo a cada lista
+    cache.salvar(f"steam_id:{nome_jogo}", steam_id or '', TTL_STEAM_ID if steam_id else TTL_STEAM_SEM_ID)
+    return steam_id
+
+def _resolver_em_segundo_plano(nome_jogo):
+    try:
+        _consultar_id_steam(nome_jogo, timeout=5, espera_maxima=ESPERA_STEAM_SEGUNDO_PLANO)
+    except Exception as e:
+        print(f"Erro ao buscar '{nome_jogo}' na Steam em segundo plano: {e}")
+    finally:
+        with _lock_fila_steam:
+            _fila_steam.discard(nome_jogo)
+
+def _agendar_busca_steam(nome_jogo):
+    with _lock_fila_steam:
+        if nome_jogo in _fila_steam or len(_fila_steam) >= MAX_FILA_STEAM:
+            return
+        _fila_steam.add(nome_jogo)
+    _executor_steam.submit(_resolver_em_segundo_plano, nome_jogo)
 
 def _buscar_id_steam_por_nome(nome_jogo):
     """
     Busca o AppID da Steam usando o nome do jogo na API de busca da Steam.
+    Retorna o AppID, None (não está na Steam ou a busca falhou) ou _BUSCA_ADIADA
+    (sem token agora: a busca continua em segundo plano).
     """
     # Verifica cache primeiro
-    if nome_jogo in _steam_id_cache:
-        return _steam_id_cache[nome_jogo]
+    steam_id = cache.obter(f"steam_id:{nome_jogo}")
+    if steam_id is not None:
+        return steam_id or None
 
     try:
-        # API de busca da Steam 
-        url = f"https://store.steampowered.com/api/storesearch/?term={nome_jogo}&l=english&cc=US"
-        response = requests.get(url, timeout=1) # Timeout curto
-        data = response.json()
-        
-        if data and data.get('total') > 0:
-            items = data.get('items', [])
-            if items:
-                # Pega o primeiro resultado
-                steam_id = str(items[0]['id'])
-                _steam_id_cache[nome_jogo] = steam_id
-                return steam_id
-    except:
-        pass # Se falhar, usa a capa da RAWG
-    
-    return None
+        # Timeout e espera curtos: se a Steam estiver lenta ou no limite, fica a capa da RAWG
+        return _consultar_id_steam(nome_jogo, timeout=1, espera_maxima=1)
+    except LimiteExcedido:
+        _agendar_busca_steam(nome_jogo)
+        return _BUSCA_ADIADA
+    except Exception:
+        return None # Se falhar, usa a capa da RAWG
 
 def _extrair_steam_id(stores, nome_jogo):
     """
@@ -62,17 +113,23 @@ def _extrair_steam_id(stores, nome_jogo):
         
     return None
 
+def _sem_capa_provisoria(resultado):
+    """Só guarda no cache jogos (ou listas de jogos) que já têm a capa definitiva."""
+    jogos = resultado if isinstance(resultado, list) else [resultado]
+    return not any(jogo.get('capa_provisoria') for jogo in jogos)
+
 def _gerar_capa_steam(steam_id):
     """Gera a URL da capa vertical da Steam."""
     if not steam_id:
         return None
     return f"https://shared.akamai.steamstatic.com/store_item_assets/steam/apps/{steam_id}/library_600x900.jpg"
 
+@cache_resultado(ttl=TTL_DETALHES)
 def _buscar_dados_steam_detalhes(app_id):
     """Busca dados ricos na API pública da Steam."""
     url_steam = f"https://store.steampowered.com/api/appdetails?appids={app_id}&l=brazilian"
     try:
-        response = requests.get(url_steam, timeout=3)
+        response = requisitar('steam', url_steam, timeout=3)
         dados = response.json()
         if dados and str(app_id) in dados and dados[str(app_id)]['success']:
             return dados[str(app_id)]['data']
@@ -86,7 +143,8 @@ def _formatar_jogos_lista(resultados):
     for jogo in resultados:
         # 1. Tenta achar ID e Capa Steam
         steam_id = _extrair_steam_id(jogo.get('stores', []), jogo.get('name'))
-        capa_steam = _gerar_capa_steam(steam_id)
+        capa_provisoria = steam_id is _BUSCA_ADIADA
+        capa_steam = None if capa_provisoria else _gerar_capa_steam(steam_id)
         
         # 2. Define a imagem principal e o estilo
         if capa_steam:
@@ -104,10 +162,15 @@ def _formatar_jogos_lista(resultados):
             'imagem_rawg': jogo.get('background_image'), 
             'origem_imagem': origem, # Para o HTML saber qual layout usar
             'nota': jogo.get('metacritic'),
+            'data_lancamento': jogo.get('released'),
+            'generos': [g['name'] for g in jogo.get('genres', [])],
+            'capa_provisoria': capa_provisoria, # Capa da Steam ainda sendo buscada
             'tipo': 'game'
         })
     return jogos_formatados
 
+@indexar
+@cache_resultado(ttl=TTL_JOGOS_POPULARES, guardar_se=_sem_capa_provisoria)
 def buscar_jogos_populares(pagina=1, page_size=25):
     """Busca jogos populares."""
     endpoint = f"{BASE_URL}/games"
@@ -119,7 +182,7 @@ def buscar_jogos_populares(pagina=1, page_size=25):
     }
 
     try:
-        response = requests.get(endpoint, params=params)
+        response = requisitar('rawg', endpoint, params=params)
         response.raise_for_status()
         return _formatar_jogos_lista(response.json().get('results', []))
 
@@ -127,6 +190,8 @@ def buscar_jogos_populares(pagina=1, page_size=25):
         print(f"Erro ao buscar jogos na RAWG: {e}")
         return []
 
+# Sem @indexar, pelo mesmo motivo de pesquisar_midia
+@cache_resultado(ttl=TTL_PESQUISA, guardar_se=_sem_capa_provisoria)
 def pesquisar_jogos(query):
     """Pesquisa jogos por nome."""
     endpoint = f"{BASE_URL}/games"
@@ -137,7 +202,7 @@ def pesquisar_jogos(query):
     }
 
     try:
-        response = requests.get(endpoint, params=params)
+        response = requisitar('rawg', endpoint, params=params)
         response.raise_for_status()
         return _formatar_jogos_lista(response.json().get('results', []))
 
@@ -145,12 +210,35 @@ def pesquisar_jogos(query):
         print(f"Erro ao pesquisar jogos: {e}")
         return []
 
+@indexar
+@cache_resultado(ttl=TTL_PERIODO, guardar_se=_sem_capa_provisoria)
+def buscar_jogos_por_periodo(ano_inicio, ano_fim, pagina=1):
+    """Busca os jogos mais bem avaliados lançados entre dois anos (alimenta o índice de décadas)."""
+    endpoint = f"{BASE_URL}/games"
+    params = {
+        'key': RAWG_API_KEY,
+        'dates': f'{ano_inicio}-01-01,{ano_fim}-12-31',
+        'ordering': '-metacritic',
+        'page_size': 40,
+        'page': pagina
+    }
+
+    try:
+        response = requisitar('rawg', endpoint, params=params)
+        response.raise_for_status()
+        return _formatar_jogos_lista(response.json().get('results', []))
+
+    except requests.exceptions.RequestException as e:
+        print(f"Erro ao buscar jogos de {ano_inicio} a {ano_fim}: {e}")
+        return []
+
+@cache_resultado(ttl=TTL_DETALHES, guardar_se=_sem_capa_provisoria)
 def buscar_detalhes_jogo(game_id_ou_slug):
     """Busca detalhada HÍBRIDA."""
     url_rawg = f"{BASE_URL}/games/{game_id_ou_slug}?key={RAWG_API_KEY}"
     
     try:
-        response = requests.get(url_rawg)
+        response = requisitar('rawg', url_rawg)
         dados_rawg = response.json()
         
         descricao_limpa = re.sub('<[^<]+?>', '', dados_rawg.get('description', ''))
@@ -166,10 +254,14 @@ def buscar_detalhes_jogo(game_id_ou_slug):
             'plataformas': [p['platform']['name'] for p in dados_rawg.get('platforms', [])],
             'preco': 'Não informado',
             'requisitos': None,
+            'capa_provisoria': False,
             'tipo': 'game'
         }
 
         steam_id = _extrair_steam_id(dados_rawg.get('stores', []), dados_rawg.get('name'))
+        if steam_id is _BUSCA_ADIADA:
+            jogo_final['capa_provisoria'] = True
+            steam_id = None
         
         if steam_id:
             capa_steam = _gerar_capa_steam(steam_id)
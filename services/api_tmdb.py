@@ -1,14 +1,34 @@
 import os
 import requests
 from dotenv import load_dotenv
+from services.cache import cache_resultado
+from services.limitador import requisitar
+from services.indice_catalogo import indexar
 
 load_dotenv()
 
 TMDB_API_KEY = os.environ.get('TMDB_API_KEY')
 BASE_URL = "https://api.themoviedb.org/3"
 IMAGE_BASE_URL = "https://image.tmdb.org/t/p/w500"
+IDIOMA_PADRAO = 'pt-BR'
 
-def _formatar_resultados(resultados, tipo_midia_padrao=None):
+# Tempo (em segundos) que cada tipo de lista fica em cache
+TTL_POPULARES = 30 * 60      # Listas de populares mudam ao longo do dia
+TTL_CLASSICOS = 6 * 60 * 60  # Clássicos e nostalgia quase não mudam
+TTL_GENEROS = 60 * 60
+TTL_PESQUISA = 60 * 60
+TTL_PERIODO = 24 * 60 * 60  # Listas por década, usadas para alimentar o índice local
+TTL_NOMES_GENEROS = 7 * 24 * 60 * 60
+TTL_DETALHES = 24 * 60 * 60  # Página de detalhes de um título
+
+class ListaPaginada(list):
+    """Lista de resultados de uma página que também guarda o total de páginas da consulta no TMDB."""
+
+    def __init__(self, itens=(), total_paginas=None):
+        super().__init__(itens)
+        self.total_paginas = total_paginas
+
+def _formatar_resultados(resultados, tipo_midia_padrao=None, total_paginas=None):
     """
     Função auxiliar para formatar a lista de resultados (filmes ou séries)
     de maneira padronizada para o nosso HTML.
@@ -32,11 +52,14 @@ def _formatar_resultados(resultados, tipo_midia_padrao=None):
                 'data_lancamento': data,
                 'poster_url': f"{IMAGE_BASE_URL}{item['poster_path']}" if item.get('poster_path') else None,
                 'nota': item.get('vote_average'),
-                'tipo': tipo # Útil para saber se é filme ou série no link de detalhes
+                'tipo': tipo, # Útil para saber se é filme ou série no link de detalhes
+                'generos_ids': item.get('genre_ids', [])
             })
-    return lista_formatada
+    return ListaPaginada(lista_formatada, total_paginas)
 
-def buscar_filmes_populares(pagina=1):
+@indexar  # Alimenta o índice local por data (seções por década), inclusive nas leituras do cache
+@cache_resultado(ttl=TTL_POPULARES)
+def buscar_filmes_populares(pagina=1, idioma=IDIOMA_PADRAO):
     """
     Busca os filmes populares atuais no TMDB.
     Retorna uma lista de dicionários com os dados dos filmes.
@@ -45,12 +68,12 @@ def buscar_filmes_populares(pagina=1):
     
     params = {
         'api_key': TMDB_API_KEY,
-        'language': 'pt-BR', # Traz os resultados em português
+        'language': idioma, # pt-BR por padrão; outros idiomas vêm de services/catalogo_idiomas.py
         'page': pagina
     }
 
     try:
-        response = requests.get(endpoint, params=params)
+        response = requisitar('tmdb', endpoint, params=params)
         response.raise_for_status() # Levanta erro se a requisição falhar
         
         dados = response.json()
@@ -66,7 +89,9 @@ def buscar_filmes_populares(pagina=1):
                 'data_lancamento': filme['release_date'],
                 # Monta a URL completa da imagem. Se não tiver imagem, pode colocar uma padrão depois.
                 'poster_url': f"{IMAGE_BASE_URL}{filme['poster_path']}" if filme.get('poster_path') else None,
-                'nota': filme['vote_average']
+                'nota': filme['vote_average'],
+                'tipo': 'movie',
+                'generos_ids': filme.get('genre_ids', [])
             })
             
         return filmes_formatados
@@ -75,55 +100,60 @@ def buscar_filmes_populares(pagina=1):
         print(f"Erro ao conectar com a API do TMDB: {e}")
         return []
 
-def buscar_series_populares(pagina=1):
+@indexar
+@cache_resultado(ttl=TTL_POPULARES)
+def buscar_series_populares(pagina=1, idioma=IDIOMA_PADRAO):
     """
     Busca as séries populares atuais no TMDB.
     Retorna uma lista de dicionários com os dados das séries.
     """
     endpoint = f"{BASE_URL}/tv/popular"
-    params = {'api_key': TMDB_API_KEY, 'language': 'pt-BR', 'page': pagina}
+    params = {'api_key': TMDB_API_KEY, 'language': idioma, 'page': pagina}
     
     try:
-        response = requests.get(endpoint, params=params)
+        response = requisitar('tmdb', endpoint, params=params)
         response.raise_for_status()
         return _formatar_resultados(response.json().get('results', []), tipo_midia_padrao='tv')
     except requests.exceptions.RequestException as e:
         print(f"Erro ao buscar séries: {e}")
         return []
 
-def pesquisar_midia(query, pagina=1):
+# Sem @indexar: cada busca livre de usuário entraria no índice (e na matriz de recomendações) para sempre
+@cache_resultado(ttl=TTL_PESQUISA)
+def pesquisar_midia(query, pagina=1, idioma=IDIOMA_PADRAO):
     """
     Pesquisa por filmes e séries com base em um texto (query).
     """
     endpoint = f"{BASE_URL}/search/multi" # 'multi' busca filmes e séries ao mesmo tempo
     params = {
         'api_key': TMDB_API_KEY, 
-        'language': 'pt-BR', 
+        'language': idioma, 
         'page': pagina,
         'query': query,
         'include_adult': 'false'
     }
     
     try:
-        response = requests.get(endpoint, params=params)
+        response = requisitar('tmdb', endpoint, params=params)
         response.raise_for_status()
         return _formatar_resultados(response.json().get('results', []))
     except requests.exceptions.RequestException as e:
         print(f"Erro ao pesquisar mídia '{query}': {e}")
         return []
 
-def buscar_detalhes_filme(filme_id):
+@cache_resultado(ttl=TTL_DETALHES)
+def buscar_detalhes_filme(filme_id, idioma=IDIOMA_PADRAO):
     """
     Busca os detalhes completos de um filme específico pelo ID.
     """
     endpoint = f"{BASE_URL}/movie/{filme_id}"
     params = {
         'api_key': TMDB_API_KEY,
-        'language': 'pt-BR'
+        'language': idioma
     }
 
     try:
-        response = requests.get(endpoint, params=params)
+        response = requisitar('tmdb', endpoint, params=params)
         response.raise_for_status()
         filme = response.json()
 
@@ -145,7 +175,42 @@ def buscar_detalhes_filme(filme_id):
         print(f"Erro ao buscar detalhes do filme {filme_id}: {e}")
         return None
 
-def buscar_filmes_classicos(pagina=1):
+@cache_resultado(ttl=TTL_DETALHES)
+def buscar_detalhes_serie(serie_id, idioma=IDIOMA_PADRAO):
+    """
+    Busca os detalhes completos de uma série específica pelo ID.
+    """
+    endpoint = f"{BASE_URL}/tv/{serie_id}"
+    params = {
+        'api_key': TMDB_API_KEY,
+        'language': idioma
+    }
+
+    try:
+        response = requisitar('tmdb', endpoint, params=params)
+        response.raise_for_status()
+        serie = response.json()
+
+        return {
+            'id': serie['id'],
+            'titulo': serie['name'],
+            'sinopse': serie.get('overview', 'Sinopse indisponível.'),
+            'data_lancamento': serie.get('first_air_date'),
+            'poster_url': f"{IMAGE_BASE_URL}{serie['poster_path']}" if serie.get('poster_path') else None,
+            'backdrop_url': f"{IMAGE_BASE_URL}{serie['backdrop_path']}" if serie.get('backdrop_path') else None,
+            'nota': serie.get('vote_average'),
+            'generos': [g['name'] for g in serie.get('genres', [])],
+            'temporadas': serie.get('number_of_seasons'),
+            'tipo': 'tv'
+        }
+
+    except requests.exceptions.RequestException as e:
+        print(f"Erro ao buscar detalhes da série {serie_id}: {e}")
+        return None
+
+@indexar
+@cache_resultado(ttl=TTL_CLASSICOS)
+def buscar_filmes_classicos(pagina=1, idioma=IDIOMA_PADRAO):
     """
     Busca filmes bem avaliados (Top Rated) para a seção de Clássicos.
     """
@@ -153,12 +218,12 @@ def buscar_filmes_classicos(pagina=1):
     
     params = {
         'api_key': TMDB_API_KEY,
-        'language': 'pt-BR',
+        'language': idioma,
         'page': pagina
     }
 
     try:
-        response = requests.get(endpoint, params=params)
+        response = requisitar('tmdb', endpoint, params=params)
         response.raise_for_status()
         return _formatar_resultados(response.json().get('results', []), tipo_midia_padrao='movie')
 
@@ -166,7 +231,9 @@ def buscar_filmes_classicos(pagina=1):
         print(f"Erro ao buscar filmes clássicos: {e}")
         return []
 
-def buscar_series_nostalgia(pagina=1):
+@indexar
+@cache_resultado(ttl=TTL_CLASSICOS)
+def buscar_series_nostalgia(pagina=1, idioma=IDIOMA_PADRAO):
     """
     Busca séries populares que foram lançadas antes de 2010 (Anos 2000/90).
     """
@@ -174,7 +241,7 @@ def buscar_series_nostalgia(pagina=1):
     
     params = {
         'api_key': TMDB_API_KEY,
-        'language': 'pt-BR',
+        'language': idioma,
         'sort_by': 'vote_count.desc', # Ordena por quantidade de votos (geralmente indica clássicos populares)
         'first_air_date.lte': '2014-12-31', # Apenas séries lançadas antes de 2014
         'first_air_date.gte': '1990-01-01', # A partir de 1990
@@ -182,7 +249,7 @@ def buscar_series_nostalgia(pagina=1):
     }
 
     try:
-        response = requests.get(endpoint, params=params)
+        response = requisitar('tmdb', endpoint, params=params)
         response.raise_for_status()
         return _formatar_resultados(response.json().get('results', []), tipo_midia_padrao='tv')
 
@@ -190,7 +257,9 @@ def buscar_series_nostalgia(pagina=1):
         print(f"Erro ao buscar séries nostalgia: {e}")
         return []
 
-def buscar_catalogo_filmes(pagina=1):
+@indexar
+@cache_resultado(ttl=TTL_POPULARES)
+def buscar_catalogo_filmes(pagina=1, idioma=IDIOMA_PADRAO):
     """
     Função para a página /filmes.
     Busca filmes populares para preencher a grade do catálogo.
@@ -199,21 +268,27 @@ def buscar_catalogo_filmes(pagina=1):
     endpoint = f"{BASE_URL}/movie/popular"
     params = {
         'api_key': TMDB_API_KEY,
-        'language': 'pt-BR',
+        'language': idioma,
         'page': pagina
     }
     
     try:
-        response = requests.get(endpoint, params=params)
+        response = requisitar('tmdb', endpoint, params=params)
         response.raise_for_status()
         # Reutiliza a formatação padrão para garantir que tenha 'poster_url', 'titulo', etc.
-        return _formatar_resultados(response.json().get('results', []), tipo_midia_padrao='movie')
+        dados = response.json()
+        return _formatar_resultados(
+            dados.get('results', []), tipo_midia_padrao='movie',
+            total_paginas=dados.get('total_pages')  # Usado pela paginação para saber onde a lista acaba
+        )
 
     except requests.exceptions.RequestException as e:
         print(f"Erro ao buscar catálogo de filmes: {e}")
         return []
 
-def buscar_catalogo_series(pagina=1):
+@indexar
+@cache_resultado(ttl=TTL_POPULARES)
+def buscar_catalogo_series(pagina=1, idioma=IDIOMA_PADRAO):
     """
     Função para a página /series.
     Busca séries populares para preencher a grade do catálogo.
@@ -221,20 +296,26 @@ def buscar_catalogo_series(pagina=1):
     endpoint = f"{BASE_URL}/tv/popular"
     params = {
         'api_key': TMDB_API_KEY,
-        'language': 'pt-BR',
+        'language': idioma,
         'page': pagina
     }
     
     try:
-        response = requests.get(endpoint, params=params)
+        response = requisitar('tmdb', endpoint, params=params)
         response.raise_for_status()
-        return _formatar_resultados(response.json().get('results', []), tipo_midia_padrao='tv')
+        dados = response.json()
+        return _formatar_resultados(
+            dados.get('results', []), tipo_midia_padrao='tv',
+            total_paginas=dados.get('total_pages')  # Usado pela paginação para saber onde a lista acaba
+        )
 
     except requests.exceptions.RequestException as e:
         print(f"Erro ao buscar catálogo de séries: {e}")
         return []
 
-def buscar_filmes_por_genero(generos, pagina=1):
+@indexar
+@cache_resultado(ttl=TTL_GENEROS)
+def buscar_filmes_por_genero(generos, pagina=1, idioma=IDIOMA_PADRAO):
     """
     Busca filmes filtrados por gênero(s).
     
@@ -248,22 +329,28 @@ def buscar_filmes_por_genero(generos, pagina=1):
     endpoint = f"{BASE_URL}/discover/movie"
     params = {
         'api_key': TMDB_API_KEY,
-        'language': 'pt-BR',
+        'language': idioma,
         'page': pagina,
         'sort_by': 'popularity.desc',
         'with_genres': generos  # Ex: "28,35" = Ação E Comédia
     }
     
     try:
-        response = requests.get(endpoint, params=params)
+        response = requisitar('tmdb', endpoint, params=params)
         response.raise_for_status()
-        return _formatar_resultados(response.json().get('results', []), tipo_midia_padrao='movie')
+        dados = response.json()
+        return _formatar_resultados(
+            dados.get('results', []), tipo_midia_padrao='movie',
+            total_paginas=dados.get('total_pages')  # Usado pela paginação para saber onde a lista acaba
+        )
 
     except requests.exceptions.RequestException as e:
         print(f"Erro ao buscar filmes por gênero: {e}")
         return []
 
-def buscar_series_por_genero(generos, pagina=1):
+@indexar
+@cache_resultado(ttl=TTL_GENEROS)
+def buscar_series_por_genero(generos, pagina=1, idioma=IDIOMA_PADRAO):
     """
     Busca séries filtradas por gênero(s).
     
@@ -277,21 +364,73 @@ def buscar_series_por_genero(generos, pagina=1):
     endpoint = f"{BASE_URL}/discover/tv"
     params = {
         'api_key': TMDB_API_KEY,
-        'language': 'pt-BR',
+        'language': idioma,
         'page': pagina,
         'sort_by': 'popularity.desc',
         'with_genres': generos
     }
     
     try:
-        response = requests.get(endpoint, params=params)
+        response = requisitar('tmdb', endpoint, params=params)
         response.raise_for_status()
-        return _formatar_resultados(response.json().get('results', []), tipo_midia_padrao='tv')
+        dados = response.json()
+        return _formatar_resultados(
+            dados.get('results', []), tipo_midia_padrao='tv',
+            total_paginas=dados.get('total_pages')  # Usado pela paginação para saber onde a lista acaba
+        )
 
     except requests.exceptions.RequestException as e:
         print(f"Erro ao buscar séries por gênero: {e}")
         return []
 
+@indexar
+@cache_resultado(ttl=TTL_PERIODO)
+def buscar_por_periodo(tipo, ano_inicio, ano_fim, pagina=1, idioma=IDIOMA_PADRAO):
+    """
+    Busca filmes ('movie') ou séries ('tv') mais votados lançados entre dois anos.
+    Usada pelo agendador para manter o índice local de décadas preenchido.
+    """
+    endpoint = f"{BASE_URL}/discover/{tipo}"
+    campo_data = 'primary_release_date' if tipo == 'movie' else 'first_air_date'
+    params = {
+        'api_key': TMDB_API_KEY,
+        'language': idioma,
+        'sort_by': 'vote_count.desc',
+        f'{campo_data}.gte': f'{ano_inicio}-01-01',
+        f'{campo_data}.lte': f'{ano_fim}-12-31',
+        'page': pagina
+    }
+
+    try:
+        response = requisitar('tmdb', endpoint, params=params)
+        response.raise_for_status()
+        return _formatar_resultados(response.json().get('results', []), tipo_midia_padrao=tipo)
+
+    except requests.exceptions.RequestException as e:
+        print(f"Erro ao buscar {tipo} de {ano_inicio} a {ano_fim}: {e}")
+        return []
+
+@cache_resultado(ttl=TTL_NOMES_GENEROS)
+def buscar_nomes_generos(tipo, idioma=IDIOMA_PADRAO):
+    """
+    Nomes dos gêneros de filmes ('movie') ou séries ('tv') num idioma.
+    Retorna um dicionário {id_genero: nome}.
+    """
+    endpoint = f"{BASE_URL}/genre/{tipo}/list"
+    params = {
+        'api_key': TMDB_API_KEY,
+        'language': idioma
+    }
+
+    try:
+        response = requisitar('tmdb', endpoint, params=params)
+        response.raise_for_status()
+        return {g['id']: g['name'] for g in response.json().get('genres', [])}
+
+    except requests.exceptions.RequestException as e:
+        print(f"Erro ao buscar gêneros de {tipo} em {idioma}: {e}")
+        return {}
+
 # Teste rápido das funções
 if __name__ == "__main__":
     print("--- Testando Filmes ---")
@@ -0,0 +1,246 @@
+"""
+Cache dos resultados dos serviços (TMDB, RAWG, Steam, Gemini).
+
+O armazenamento é plugável e escolhido pela variável CACHE_BACKEND:
+    memoria  -> LRU dentro do processo (padrão; cada worker tem o seu)
+    sqlite   -> arquivo SQLite local compartilhado entre os workers da mesma máquina
+                (caminho em CACHE_URL, padrão: instance/cache.sqlite3)
+    redis    -> servidor Redis ou compatível (Valkey, KeyDB...), endereço em CACHE_URL
+
+Com sqlite ou redis, adicionar workers no gunicorn não multiplica as chamadas às APIs
+nem a memória usada, porque todos leem o mesmo cache.
+"""
+import os
+import time
+import zlib
+import pickle
+import sqlite3
+import inspect
+import threading
+from functools import wraps
+from cachetools import LRUCache
+
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memoria')
+CACHE_URL = os.environ.get('CACHE_URL')
+CACHE_MAX_ITENS = int(os.environ.get('CACHE_MAX_ITENS', 5000))
+PREFIXO = 'nostalgia:'
+
+# Pasta de dados do app (a mesma instance/ do Flask). Nada vai para a pasta temporária do
+# sistema: qualquer usuário da máquina pode criar arquivos lá antes do app, e o cache
+# SQLite é lido com pickle.
+PASTA_INSTANCIA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance')
+
+def caminho_instancia(nome):
+    """Caminho de um arquivo do app em instance/, criando a pasta (só para o dono) se preciso."""
+    os.makedirs(PASTA_INSTANCIA, mode=0o700, exist_ok=True)
+    return os.path.join(PASTA_INSTANCIA, nome)
+
+# Valores serializados maiores que isso são comprimidos com zlib
+_LIMITE_COMPRESSAO = 1024
+
+def _serializar(expira_em, valor):
+    """Serialização compacta: pickle binário, comprimido quando vale a pena."""
+    dados = pickle.dumps((expira_em, valor), protocol=pickle.HIGHEST_PROTOCOL)
+    if len(dados) > _LIMITE_COMPRESSAO:
+        return b'z' + zlib.compress(dados)
+    return b'p' + dados
+
+def _desserializar(dados):
+    if dados[:1] == b'z':
+        return pickle.loads(zlib.decompress(dados[1:]))
+    return pickle.loads(dados[1:])
+
+class CacheMemoria:
+    """LRU dentro do processo. Rápido, mas cada worker guarda sua própria cópia."""
+
+    compartilhado = False
+
+    def __init__(self, max_itens=CACHE_MAX_ITENS):
+        self._itens = LRUCache(maxsize=max_itens)
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        with self._lock:
+            entrada = self._itens.get(chave)
+        if entrada and entrada[0] > time.time():
+            return entrada
+        return None
+
+    def salvar(self, chave, valor, ttl):
+        with self._lock:
+            self._itens[chave] = (time.time() + ttl, valor)
+
+    def remover(self, chave):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+class CacheSQLite:
+    """Arquivo SQLite (modo WAL) compartilhado pelos workers da mesma máquina."""
+
+    compartilhado = True
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho or caminho_instancia('cache.sqlite3')
+        self._local = threading.local()
+        with self._conexao() as conexao:
+            conexao.execute(
+                'CREATE TABLE IF NOT EXISTS cache (chave TEXT PRIMARY KEY, expira_em REAL, valor BLOB)'
+            )
+
+    def _conexao(self):
+        # sqlite3 não deve compartilhar conexões entre threads: uma por thread
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=5, isolation_level=None)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            self._local.conexao = conexao
+        return conexao
+
+    def obter(self, chave):
+        linha = self._conexao().execute(
+            'SELECT valor FROM cache WHERE chave = ? AND expira_em > ?', (chave, time.time())
+        ).fetchone()
+        return _desserializar(linha[0]) if linha else None
+
+    def salvar(self, chave, valor, ttl):
+        expira_em = time.time() + ttl
+        conexao = self._conexao()
+        conexao.execute(
+            'INSERT OR REPLACE INTO cache (chave, expira_em, valor) VALUES (?, ?, ?)',
+            (chave, expira_em, _serializar(expira_em, valor))
+        )
+        # De vez em quando remove o que já expirou para o arquivo não crescer para sempre
+        if hash(chave) % 100 == 0:
+            conexao.execute('DELETE FROM cache WHERE expira_em <= ?', (time.time(),))
+
+    def remover(self, chave):
+        self._conexao().execute('DELETE FROM cache WHERE chave = ?', (chave,))
+
+    def limpar(self):
+        self._conexao().execute('DELETE FROM cache')
+
+class CacheRedis:
+    """Servidor Redis ou compatível. Compartilhado entre workers e máquinas."""
+
+    compartilhado = True
+
+    def __init__(self, url=None):
+        import redis  # Dependência opcional, só necessária com CACHE_BACKEND=redis
+        self._cliente = redis.Redis.from_url(url or 'redis://localhost:6379/0')
+
+    def obter(self, chave):
+        dados = self._cliente.get(PREFIXO + chave)
+        return _desserializar(dados) if dados else None
+
+    def salvar(self, chave, valor, ttl):
+        expira_em = time.time() + ttl
+        self._cliente.set(PREFIXO + chave, _serializar(expira_em, valor), ex=max(1, int(ttl)))
+
+    def remover(self, chave):
+        self._cliente.delete(PREFIXO + chave)
+
+    def limpar(self):
+        for chave in self._cliente.scan_iter(PREFIXO + '*'):
+            self._cliente.delete(chave)
+
+def _criar_backend():
+    """Cria o backend configurado. Se não for possível, usa o cache em memória."""
+    try:
+        if CACHE_BACKEND == 'sqlite':
+            return CacheSQLite(CACHE_URL)
+        if CACHE_BACKEND == 'redis':
+            return CacheRedis(CACHE_URL)
+    except Exception as e:
+        print(f"AVISO: cache '{CACHE_BACKEND}' indisponível ({e}). Usando cache em memória.")
+    return CacheMemoria()
+
+backend = _criar_backend()
+
+def compartilhado():
+    """True se outros processos enxergam o que este grava (sqlite ou redis)."""
+    return backend.compartilhado
+
+def obter(chave, padrao=None):
+    """Lê um valor do cache. Erros no backend contam como ausência."""
+    try:
+        entrada = backend.obter(chave)
+    except Exception as e:
+        print(f"Erro ao ler cache '{chave}': {e}")
+        return padrao
+    return entrada[1] if entrada else padrao
+
+def salvar(chave, valor, ttl):
+    """Grava um valor no cache por `ttl` segundos."""
+    try:
+        backend.salvar(chave, valor, ttl)
+    except Exception as e:
+        print(f"Erro ao gravar cache '{chave}': {e}")
+
+def _montar_chave(funcao, args, kwargs):
+    """
+    Monta a chave do cache a partir do nome da função e dos argumentos.
+    Usa a assinatura da função para que buscar(pagina=1) e buscar(1) caiam na mesma chave.
+    """
+    try:
+        argumentos = inspect.signature(funcao).bind(*args, **kwargs)
+        argumentos.apply_defaults()
+        valores = tuple(sorted(argumentos.arguments.items()))
+    except TypeError:
+        valores = (args, tuple(sorted(kwargs.items())))
+    return f"{funcao.__module__}.{funcao.__qualname__}:{valores!r}"
+
+def cache_resultado(ttl, guardar_se=None):
+    """
+    Decorador que guarda o resultado de uma função de serviço por `ttl` segundos.
+
+    Resultados vazios (listas vazias / None, que indicam erro na API) não são guardados,
+    para que a próxima chamada tente de novo. `guardar_se` é uma função opcional que
+    recebe o resultado e diz se ele pode ir para o cache (ex: listas com dados provisórios).
+
+    A função decorada ganha dois atributos usados pelo agendador:
+        funcao.atualizar(*args, **kwargs): busca de novo e substitui o valor no cache
+        funcao.expira_em(*args, **kwargs): timestamp de expiração (ou None se não estiver em cache)
+    """
+    def decorador(funcao):
+        def _atualizar(chave, args, kwargs):
+            resultado = funcao(*args, **kwargs)
+            if resultado and (guardar_se is None or guardar_se(resultado)):
+                salvar(chave, resultado, ttl)
+            return resultado
+
+        def _ler(chave):
+            try:
+                return backend.obter(chave)
+            except Exception as e:
+                print(f"Erro ao ler cache '{chave}': {e}")
+                return None
+
+        @wraps(funcao)
+        def envolvida(*args, **kwargs):
+            chave = _montar_chave(funcao, args, kwargs)
+            entrada = _ler(chave)
+            if entrada:
+                return entrada[1]
+            return _atualizar(chave, args, kwargs)
+
+        def atualizar(*args, **kwargs):
+            return _atualizar(_montar_chave(funcao, args, kwargs), args, kwargs)
+
+        def expira_em(*args, **kwargs):
+            entrada = _ler(_montar_chave(funcao, args, kwargs))
+            return entrada[0] if entrada else None
+
+        envolvida.atualizar = atualizar
+        envolvida.expira_em = expira_em
+        envolvida.ttl = ttl
+        return envolvida
+    return decorador
+
+def limpar_cache():
+    """Remove tudo que estiver no cache (útil em testes manuais)."""
+    backend.limpar()
@@ -0,0 +1,151 @@
+"""
+Catálogo em vários idiomas sem duplicar o que não depende de idioma.
+
+As listas e os detalhes do TMDB continuam sendo buscados e guardados uma única vez em pt-BR
+(IDs, ordem, pôsteres, notas, datas). Para outro idioma, só os campos traduzidos (título, sinopse
+e, nos detalhes, gêneros) são guardados, por título, no cache compartilhado; os nomes de gênero vêm de uma tabela por idioma
+(pt-BR incluído, para que todo item do TMDB traga o campo `generos`).
+O que não tiver tradução fica em pt-BR.
+"""
+import inspect
+from services import cache
+from services.api_tmdb import IDIOMA_PADRAO, ListaPaginada, buscar_nomes_generos
+
+IDIOMAS_SUPORTADOS = ['pt-BR', 'en-US', 'es-ES']
+
+TTL_TRADUCAO = 7 * 24 * 60 * 60
+# Títulos que não vieram na página traduzida: evita buscar de novo a cada acesso
+TTL_SEM_TRADUCAO = 6 * 60 * 60
+
+def _chave_traducao(tipo, id_midia, idioma):
+    return f"traducao:{tipo}:{id_midia}:{idioma}"
+
+def normalizar_idioma(idioma):
+    """Devolve o idioma suportado correspondente ('en' -> 'en-US') ou o padrão."""
+    if not idioma:
+        return IDIOMA_PADRAO
+    for suportado in IDIOMAS_SUPORTADOS:
+        if suportado.lower() == idioma.lower() or suportado.split('-')[0] == idioma.lower():
+            return suportado
+    return IDIOMA_PADRAO
+
+def _buscar_traducoes(funcao, idioma, itens, **kwargs):
+    """
+    Traduções dos itens: primeiro do cache; as que faltarem vêm de uma única chamada
+    da mesma lista no idioma pedido, sem passar pelo cache de listas.
+    """
+    traducoes = {}
+    faltando = set()
+    for item in itens:
+        chave = (item.get('tipo'), item['id'])
+        traducao = cache.obter(_chave_traducao(*chave, idioma))
+        if traducao is None:
+            faltando.add(chave)
+        else:
+            traducoes[chave] = traducao
+
+    if not faltando:
+        return traducoes
+
+    buscar_sem_cache = inspect.unwrap(funcao)
+    for item in buscar_sem_cache(idioma=idioma, **kwargs) or []:
+        chave = (item.get('tipo'), item['id'])
+        traducao = {'titulo': item.get('titulo'), 'sinopse': item.get('sinopse')}
+        cache.salvar(_chave_traducao(*chave, idioma), traducao, TTL_TRADUCAO)
+        traducoes[chave] = traducao
+        faltando.discard(chave)
+
+    # A ordem de popularidade pode mudar entre as chamadas; quem não veio fica em pt-BR
+    for chave in faltando:
+        cache.salvar(_chave_traducao(*chave, idioma), {}, TTL_SEM_TRADUCAO)
+
+    return traducoes
+
+def _aplicar_traducao(item, traducao, nomes_generos, idioma):
+    localizado = dict(item, idioma=idioma)
+    if traducao:
+        # Campo vazio no idioma pedido: mantém o texto em pt-BR
+        localizado['titulo'] = traducao.get('titulo') or item['titulo']
+        localizado['sinopse'] = traducao.get('sinopse') or item.get('sinopse')
+    if 'generos_ids' in item:
+        localizado['generos'] = [nomes_generos[g] for g in item['generos_ids'] if g in nomes_generos]
+    return localizado
+
+def _buscar_nomes_generos(itens, idioma):
+    """Tabela {id_genero: nome} por tipo ('movie'/'tv') dos itens; tipo que falhar fica sem nomes."""
+    nomes_generos = {}
+    for tipo in {item.get('tipo') for item in itens} & {'movie', 'tv'}:
+        try:
+            nomes_generos[tipo] = buscar_nomes_generos(tipo, idioma=idioma)
+        except Exception as e:
+            print(f"Erro ao buscar gêneros de {tipo} em {idioma}: {e}")
+            nomes_generos[tipo] = {}
+    return nomes_generos
+
+def localizar(funcao, idioma, **kwargs):
+    """
+    Chama uma função de lista do TMDB (ex: buscar_catalogo_filmes) e devolve os itens no idioma pedido.
+
+    Ex: localizar(buscar_catalogo_filmes, 'en-US', pagina=2)
+    """
+    idioma = normalizar_idioma(idioma)
+    itens = funcao(**kwargs)
+    if not itens:
+        return itens
+
+    traducoes = {}
+    if idioma != IDIOMA_PADRAO:
+        try:
+            traducoes = _buscar_traducoes(funcao, idioma, itens, **kwargs)
+        except Exception as e:
+            # Sem tradução os textos ficam em pt-BR, mas os gêneros continuam no idioma pedido
+            print(f"Erro ao traduzir lista para {idioma}: {e}")
+
+    nomes_generos = _buscar_nomes_generos(itens, idioma)
+
+    localizados = [
+        _aplicar_traducao(
+            item,
+            traducoes.get((item.get('tipo'), item['id'])),
+            nomes_generos.get(item.get('tipo'), {}),
+            idioma
+        )
+        for item in itens
+    ]
+    # Mantém o total de páginas que a paginação agregada usa para achar o fim da lista
+    return ListaPaginada(localizados, getattr(itens, 'total_paginas', None))
+
+def localizar_detalhes(funcao_detalhes, id_midia, idioma):
+    """
+    Detalhes de um título no idioma pedido. Os detalhes completos ficam no cache uma vez só,
+    em pt-BR; por idioma só se guardam título, sinopse e gêneros, na mesma chave de tradução
+    das listas. O que não estiver traduzido fica em pt-BR.
+    """
+    idioma = normalizar_idioma(idioma)
+    detalhes = funcao_detalhes(id_midia)
+    if idioma == IDIOMA_PADRAO or not detalhes:
+        return detalhes
+
+    chave = _chave_traducao(detalhes['tipo'], id_midia, idioma)
+    traducao = cache.obter(chave)
+    # Tradução vinda de uma lista não tem os gêneros: completa com os detalhes no idioma,
+    # sem passar pelo cache de detalhes
+    if not traducao or 'generos' not in traducao:
+        try:
+            traduzidos = inspect.unwrap(funcao_detalhes)(id_midia, idioma=idioma)
+        except Exception as e:
+            print(f"Erro ao traduzir detalhes de {id_midia} para {idioma}: {e}")
+            traduzidos = None
+        if traduzidos:
+            traducao = {
+                'titulo': traduzidos.get('titulo'),
+                'sinopse': traduzidos.get('sinopse'),
+                'generos': traduzidos.get('generos'),
+            }
+            cache.salvar(chave, traducao, TTL_TRADUCAO)
+
+    # Cópia: com o cache em memória, `detalhes` é o próprio objeto guardado no cache
+    localizado = _aplicar_traducao(detalhes, traducao, {}, idioma)
+    if traducao and traducao.get('generos'):
+        localizado['generos'] = traducao['generos']
+    return localizado
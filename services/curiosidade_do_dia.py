@@ -1,55 +1,88 @@
 import random
-from datetime import datetime
+from datetime import datetime, timedelta
+from services import cache
 from services.api_tmdb import buscar_filmes_populares
 from services.ia_gemini import gerar_arquivo_confidencial
 
-_cache_curiosidade = None
-_data_ultima_atualizacao = None
+# A curiosidade fica no cache compartilhado, por data, para que todos os workers
+# mostrem a mesma. Dois dias de validade cobrem a que é pré-gerada na véspera.
+TTL_CURIOSIDADE = 2 * 24 * 60 * 60
+
+def _chave(data):
+    return f"curiosidade:{data.isoformat()}"
+
+def _gerar_curiosidade():
+    """
+    Escolhe um filme popular e pede ao Gemini uma curiosidade sobre ele.
+    Retorna o objeto da curiosidade ou None se não for possível gerar.
+    """
+    # Busca lista de filmes populares
+    filmes = buscar_filmes_populares(pagina=1)
+
+    if not filmes:
+        return None
+
+    # Escolhe um filme aleatório da lista
+    filme_escolhido = random.choice(filmes)
+
+    # Chama o Gemini para gerar o texto
+    texto_curiosidade = gerar_arquivo_confidencial(filme_escolhido['titulo'], "filme", filme_escolhido['id'])
+
+    # Monta o objeto final
+    return {
+        'titulo': filme_escolhido['titulo'],
+        'data_lancamento': filme_escolhido['data_lancamento'],
+        'poster_url': filme_escolhido['poster_url'],
+        'texto': texto_curiosidade,
+        'tipo': 'filme'
+    }
 
 def get_curiosidade_diaria():
     """
     Retorna a curiosidade do dia.
-    Se já tiver gerado hoje, retorna a mesma.
+    Se já tiver gerado hoje (aqui ou pelo agendador), retorna a mesma.
     Se mudou o dia (ou é a primeira vez), gera uma nova.
     """
-    global _cache_curiosidade, _data_ultima_atualizacao
-    
     hoje = datetime.now().date()
 
-    # Se já temos uma curiosidade e a data é de hoje, retorna a que está na memória
-    if _cache_curiosidade and _data_ultima_atualizacao == hoje:
-        return _cache_curiosidade
+    # Se já temos uma curiosidade de hoje no cache, retorna ela
+    curiosidade = cache.obter(_chave(hoje))
+    if curiosidade:
+        return curiosidade
 
     print("Gerando nova curiosidade do dia...")
 
     try:
-        # Busca lista de filmes populares
-        filmes = buscar_filmes_populares(pagina=1)
-        
-        if not filmes:
+        nova_curiosidade = _gerar_curiosidade()
+        if not nova_curiosidade:
             return None
 
-        # Escolhe um filme aleatório da lista
-        filme_escolhido = random.choice(filmes)
-        
-        # Chama o Gemini para gerar o texto
-        texto_curiosidade = gerar_arquivo_confidencial(filme_escolhido['titulo'], "filme")
-
-        # 4. Monta o objeto final
-        nova_curiosidade = {
-            'titulo': filme_escolhido['titulo'],
-            'data_lancamento': filme_escolhido['data_lancamento'],
-            'poster_url': filme_escolhido['poster_url'],
-            'texto': texto_curiosidade,
-            'tipo': 'filme'
-        }
-
         # Salva no cache
-        _cache_curiosidade = nova_curiosidade
-        _data_ultima_atualizacao = hoje
-        
+        cache.salvar(_chave(hoje), nova_curiosidade, TTL_CURIOSIDADE)
+
         return nova_curiosidade
 
     except Exception as e:
         print(f"Erro ao gerar curiosidade diária: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def pre_gerar_curiosidade(data=None):
+    """
+    Gera com antecedência a curiosidade de `data` (por padrão, amanhã).
+    Chamada pelo agendador antes da meia-noite para que o primeiro
+    usuário do dia não espere pelo Gemini.
+    """
+    data = data or (datetime.now().date() + timedelta(days=1))
+
+    curiosidade = cache.obter(_chave(data))
+    if curiosidade:
+        return curiosidade
+
+    try:
+        curiosidade = _gerar_curiosidade()
+        if curiosidade:
+            cache.salvar(_chave(data), curiosidade, TTL_CURIOSIDADE)
+        return curiosidade
+    except Exception as e:
+        print(f"Erro ao pré-gerar curiosidade de {data}: {e}")
+        return None
@@ -0,0 +1,69 @@
+import unicodedata
+from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from services.api_tmdb import pesquisar_midia
+from services.api_rawg import pesquisar_jogos
+
+# Peso de cada parte da relevância (somam 1)
+PESO_TITULO = 0.8
+PESO_NOTA = 0.2
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='explorar')
+
+def _normalizar(texto):
+    texto = unicodedata.normalize('NFKD', (texto or '').lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c)).strip()
+
+def calcular_relevancia(query, item):
+    """
+    Nota de 0 a 1 usada para ordenar juntos filmes, séries e jogos.
+    Considera principalmente o quanto o título bate com a busca e, em segundo plano, a nota.
+    """
+    busca = _normalizar(query)
+    titulo = _normalizar(item.get('titulo'))
+
+    if titulo == busca:
+        parecido = 1.0
+    elif titulo.startswith(busca):
+        parecido = 0.9
+    else:
+        parecido = SequenceMatcher(None, busca, titulo).ratio()
+        if busca in titulo:
+            parecido = max(parecido, 0.75)
+
+    # TMDB dá nota de 0 a 10 e o Metacritic (RAWG) de 0 a 100
+    nota = item.get('nota') or 0
+    escala = 100 if item.get('tipo') == 'game' else 10
+    nota = min(nota / escala, 1)
+
+    return round(PESO_TITULO * parecido + PESO_NOTA * nota, 4)
+
+def pesquisar_tudo(query):
+    """
+    Pesquisa no TMDB (filmes e séries) e na RAWG (jogos) ao mesmo tempo.
+
+    É um gerador: devolve um bloco por fonte assim que ela responde, para que os filmes
+    apareçam antes do fim da busca de jogos (que ainda consulta a Steam para as capas).
+    Cada bloco é {'fonte': ..., 'itens': [...]}, com os itens já ordenados e com o campo
+    'relevancia', que permite ao cliente intercalar os blocos numa única ordem.
+    """
+    fontes = {
+        _executor.submit(pesquisar_midia, query): 'tmdb',
+        _executor.submit(pesquisar_jogos, query): 'rawg',
+    }
+
+    for futuro in as_completed(fontes):
+        fonte = fontes[futuro]
+        try:
+            itens = futuro.result()
+        except Exception as e:
+            print(f"Erro na busca '{query}' em {fonte}: {e}")
+            itens = []
+
+        # Copia os itens para não alterar o que está no cache; a busca multi do TMDB também traz pessoas
+        itens = [
+            dict(item, relevancia=calcular_relevancia(query, item))
+            for item in itens if item.get('tipo') in ('movie', 'tv', 'game')
+        ]
+        itens.sort(key=lambda item: item['relevancia'], reverse=True)
+        yield {'fonte': fonte, 'itens': itens}
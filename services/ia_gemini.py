@@ -1,54 +1,140 @@
 import os
 import google.generativeai as genai
 from dotenv import load_dotenv
+from services import cache
 
 load_dotenv()
 
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 
+# GEMINI_MODELO=stub usa um modelo local falso (testes offline, sem chave e sem rede)
+GEMINI_MODELO = os.environ.get('GEMINI_MODELO', 'gemini-2.5-flash')
+
+# Uma curiosidade gerada vale para todos que abrirem a mesma mídia depois
+TTL_CURIOSIDADE = 30 * 24 * 60 * 60
+
+MENSAGEM_INDISPONIVEL = "Curiosidade confidencial indisponível no momento."
+MENSAGEM_ERRO = "Dados confidenciais corrompidos. Tente novamente mais tarde."
+
 # Configura a API
 if GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
-else:
+elif GEMINI_MODELO != 'stub':
     print("AVISO: GEMINI_API_KEY não encontrada no arquivo .env")
 
-def gerar_arquivo_confidencial(titulo, tipo_midia):
+class _RespostaLocal:
+    def __init__(self, text):
+        self.text = text
+
+class ModeloLocal:
     """
-    Gera uma curiosidade rápida de bastidores (Trivia) sobre a mídia.
-    Ideal para a seção 'Arquivo Confidencial' da home.
+    Imita o GenerativeModel do Gemini sem acessar a rede.
+    Com stream=True devolve o texto em pedaços, como a API real.
     """
-    if not GEMINI_API_KEY:
-        return "Curiosidade confidencial indisponível no momento."
 
-    try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
+    def __init__(self, nome='stub'):
+        self.nome = nome
+
+    def generate_content(self, prompt, stream=False):
+        titulo = prompt.split('"')[1] if prompt.count('"') >= 2 else 'esta obra'
+        texto = f"Originalmente, {titulo} teria outro final, mas a equipe mudou tudo na última semana de gravação."
+        if not stream:
+            return _RespostaLocal(texto)
+        palavras = texto.split(' ')
+        return (_RespostaLocal(palavra + (' ' if i < len(palavras) - 1 else '')) for i, palavra in enumerate(palavras))
 
-        prompt = f"""
+def _obter_modelo():
+    if GEMINI_MODELO == 'stub':
+        return ModeloLocal()
+    return genai.GenerativeModel(GEMINI_MODELO)
+
+def _gemini_disponivel():
+    return GEMINI_MODELO == 'stub' or bool(GEMINI_API_KEY)
+
+def _chave_cache(titulo, tipo_midia, id_midia=None):
+    # Com o ID, a mesma mídia cai sempre na mesma chave, seja qual for o idioma do título
+    if id_midia is not None:
+        return f"curiosidade_midia:{tipo_midia}:{id_midia}"
+    return f"curiosidade_midia:{tipo_midia}:{titulo.strip().lower()}"
+
+def _montar_prompt(titulo, tipo_midia):
+    return f"""
         Aja como um especialista em curiosidades de cinema, séries e games.
         Escreva UMA única curiosidade surpreendente de bastidores sobre o {tipo_midia}: "{titulo}".
-        
+
         Regras:
         1. O texto deve ser curto e direto (máximo 40 palavras).
         2. O estilo deve ser informativo e curioso, como: "Originalmente, tal coisa seria assim..." ou "O ator tal fez isso...".
         3. NÃO use introduções como "Você sabia que" ou "Uma curiosidade é". Vá direto ao fato.
         4. Responda em Português do Brasil.
-        
+
         Exemplo de estilo desejado:
         "Originalmente, a máquina do tempo seria uma geladeira, mas Spielberg mudou a ideia por medo de que crianças começassem a se trancar em geladeiras."
         """
 
-        response = model.generate_content(prompt)
-        
-        # Retorna o texto gerado 
-        return response.text.strip()
+def gerar_arquivo_confidencial(titulo, tipo_midia, id_midia=None):
+    """
+    Gera uma curiosidade rápida de bastidores (Trivia) sobre a mídia.
+    Ideal para a seção 'Arquivo Confidencial' da home.
+    Com `id_midia`, a curiosidade é a mesma da página de detalhes daquela mídia.
+    """
+    if not _gemini_disponivel():
+        return MENSAGEM_INDISPONIVEL
+
+    # Se alguém já gerou (inclusive pelo streaming), devolve na hora
+    texto = cache.obter(_chave_cache(titulo, tipo_midia, id_midia))
+    if texto:
+        return texto
+
+    try:
+        model = _obter_modelo()
+
+        response = model.generate_content(_montar_prompt(titulo, tipo_midia))
+
+        # Retorna o texto gerado
+        texto = response.text.strip()
+        cache.salvar(_chave_cache(titulo, tipo_midia, id_midia), texto, TTL_CURIOSIDADE)
+        return texto
 
     except Exception as e:
         print(f"Erro ao gerar curiosidade para '{titulo}': {e}")
-        return "Dados confidenciais corrompidos. Tente novamente mais tarde."
+        return MENSAGEM_ERRO
+
+def gerar_arquivo_confidencial_stream(titulo, tipo_midia, id_midia):
+    """
+    Mesma curiosidade de gerar_arquivo_confidencial, mas em pedaços conforme o Gemini escreve.
+    É um gerador de textos; ao terminar, guarda o texto completo no cache (pela mídia e seu ID)
+    para os próximos visitantes.
+    """
+    if not _gemini_disponivel():
+        yield MENSAGEM_INDISPONIVEL
+        return
+
+    texto = cache.obter(_chave_cache(titulo, tipo_midia, id_midia))
+    if texto:
+        yield texto
+        return
+
+    partes = []
+    try:
+        model = _obter_modelo()
+        for pedaco in model.generate_content(_montar_prompt(titulo, tipo_midia), stream=True):
+            if pedaco.text:
+                partes.append(pedaco.text)
+                yield pedaco.text
+    except Exception as e:
+        print(f"Erro ao gerar curiosidade (stream) para '{titulo}': {e}")
+        if not partes:
+            yield MENSAGEM_ERRO
+        return
+
+    texto = ''.join(partes).strip()
+    if texto:
+        cache.salvar(_chave_cache(titulo, tipo_midia, id_midia), texto, TTL_CURIOSIDADE)
 
 # Teste rápido
 if __name__ == "__main__":
     print("Testando Curiosidade do Dia")
     # Teste com o exemplo que você deu para ver se a IA segue o padrão
     resultado = gerar_arquivo_confidencial("De Volta para o Futuro", "filme")
-    print(f"Resultado:\n{resultado}")
\ No newline at end of file
+    print(f"Resultado:\n{resultado}")
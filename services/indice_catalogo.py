@@ -0,0 +1,283 @@
+"""
+Índice local de filmes, séries e jogos já conhecidos, ordenado por data de lançamento.
+
+Toda lista devolvida pelos serviços do TMDB e da RAWG marcados com @indexar é registrada
+aqui, venha da API ou do cache. As consultas por década/ano usam busca binária
+(numpy.searchsorted) sobre as datas e máscaras vetorizadas para tipo e nota, sem nenhuma
+chamada nova às APIs.
+
+O agendador salva o índice num arquivo .npz (INDICE_CATALOGO_ARQUIVO) e, se o cache for
+compartilhado, também no cache (para processos em outras máquinas, como o `worker` do
+Procfile). Os workers do app recarregam quando ele muda, então todos enxergam o mesmo catálogo.
+"""
+import io
+import os
+import time
+import threading
+from functools import wraps
+import numpy as np
+from services import cache
+
+INDICE_ARQUIVO = os.environ.get('INDICE_CATALOGO_ARQUIVO') or cache.caminho_instancia('indice_catalogo.npz')
+INTERVALO_RECARGA = 30  # Segundos entre verificações do arquivo salvo
+CHAVE_CACHE = 'indice_catalogo'
+TTL_CACHE = 7 * 24 * 60 * 60
+IDIOMA_INDICE = 'pt-BR'  # O índice guarda sempre os textos em pt-BR
+
+TIPOS = ('movie', 'tv', 'game')
+_CODIGO_TIPO = {tipo: codigo for codigo, tipo in enumerate(TIPOS)}
+
+def _data_para_inteiro(data):
+    """'1994-09-22' -> 19940922. Retorna None para datas ausentes ou inválidas."""
+    try:
+        ano, mes, dia = (int(parte) for parte in data[:10].split('-'))
+        return ano * 10000 + mes * 100 + dia
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+def _nota_normalizada(item):
+    """Nota de 0 a 10 para todos os tipos (o Metacritic dos jogos vai de 0 a 100)."""
+    nota = item.get('nota') or 0
+    return nota / 10 if item.get('tipo') == 'game' else nota
+
+class IndiceCatalogo:
+    """Catálogo em memória com arrays numpy ordenados por data, reconstruídos só quando há novidades."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._itens = {}       # (tipo, id) -> resumo do item
+        self._sujo = False     # Há itens novos que ainda não estão nos arrays
+        self._alterado = False # Há itens novos que ainda não foram salvos no arquivo
+        self._datas = np.empty(0, dtype=np.int32)
+        self._notas = np.empty(0, dtype=np.float32)
+        self._tipos = np.empty(0, dtype=np.int8)
+        self._ordem = []       # Itens na mesma ordem dos arrays
+        self._mtime_arquivo = 0
+        self._versao_cache = 0
+        self._ultima_verificacao = 0
+        # Funções chamadas com os itens novos a cada registro (ex: motor de recomendações)
+        self.ouvintes = []
+
+    def __len__(self):
+        return len(self._itens)
+
+    def registrar(self, itens):
+        """Adiciona (ou atualiza) itens formatados pelos serviços. Itens sem data ou tipo são ignorados."""
+        registrados = []
+        with self._lock:
+            for item in itens:
+                tipo = item.get('tipo')
+                data = _data_para_inteiro(item.get('data_lancamento'))
+                if tipo not in _CODIGO_TIPO or data is None:
+                    continue
+                resumo = {
+                    'id': item['id'],
+                    'titulo': item.get('titulo'),
+                    'tipo': tipo,
+                    'data_lancamento': item.get('data_lancamento'),
+                    'poster_url': item.get('poster_url'),
+                    'nota': item.get('nota'),
+                    # IDs de gênero do TMDB e nomes de gênero da RAWG
+                    'generos_ids': list(item.get('generos_ids') or []),
+                    'generos': list(item.get('generos') or []),
+                }
+                chave = (tipo, item['id'])
+                # Listas lidas do cache voltam a cada requisição: só o que mudou conta
+                if self._itens.get(chave) == resumo:
+                    continue
+                self._itens[chave] = resumo
+                registrados.append(resumo)
+            if registrados:
+                self._sujo = True
+                self._alterado = True
+
+        if registrados:
+            for ouvinte in self.ouvintes:
+                ouvinte(registrados)
+        return len(registrados)
+
+    def todos(self):
+        """Cópia da lista de todos os itens registrados."""
+        with self._lock:
+            return list(self._itens.values())
+
+    def _construir(self):
+        """Refaz os arrays ordenados por data. Chamado com o lock já adquirido."""
+        itens = list(self._itens.values())
+        datas = np.fromiter((_data_para_inteiro(i['data_lancamento']) for i in itens), dtype=np.int32, count=len(itens))
+        ordem = np.argsort(datas, kind='stable')
+
+        self._datas = datas[ordem]
+        self._notas = np.fromiter((_nota_normalizada(i) for i in itens), dtype=np.float32, count=len(itens))[ordem]
+        self._tipos = np.fromiter((_CODIGO_TIPO[i['tipo']] for i in itens), dtype=np.int8, count=len(itens))[ordem]
+        self._ordem = [itens[posicao] for posicao in ordem]
+        self._sujo = False
+
+    def buscar(self, ano_inicio, ano_fim, tipos=None, nota_minima=None, limite=40, ordenar='nota'):
+        """
+        Itens lançados entre ano_inicio e ano_fim (inclusive).
+
+        Args:
+            tipos: lista com 'movie', 'tv' e/ou 'game' (padrão: todos)
+            nota_minima: nota de 0 a 10
+            ordenar: 'nota' (melhores primeiro) ou 'data' (mais antigos primeiro)
+        """
+        self.recarregar_se_mudou()
+
+        with self._lock:
+            if self._sujo:
+                self._construir()
+            datas, notas, tipos_arr, ordem = self._datas, self._notas, self._tipos, self._ordem
+
+        # Busca binária: as datas estão ordenadas, então o período é uma fatia contígua
+        inicio = np.searchsorted(datas, ano_inicio * 10000, side='left')
+        fim = np.searchsorted(datas, (ano_fim + 1) * 10000, side='left')
+
+        mascara = np.ones(fim - inicio, dtype=bool)
+        if tipos:
+            codigos = [_CODIGO_TIPO[tipo] for tipo in tipos if tipo in _CODIGO_TIPO]
+            mascara &= np.isin(tipos_arr[inicio:fim], codigos)
+        if nota_minima is not None:
+            mascara &= notas[inicio:fim] >= nota_minima
+
+        posicoes = np.flatnonzero(mascara)
+        if ordenar == 'nota':
+            # Ordena só o que passou no filtro, da maior nota para a menor
+            posicoes = posicoes[np.argsort(-notas[inicio:fim][posicoes], kind='stable')]
+
+        return [ordem[inicio + posicao] for posicao in posicoes[:limite]]
+
+    def salvar(self, caminho=INDICE_ARQUIVO):
+        """
+        Grava o índice num .npz para os outros processos (e no cache, se ele for
+        compartilhado). Só escreve se houve mudança.
+        """
+        with self._lock:
+            if not self._alterado:
+                return False
+            itens = list(self._itens.values())
+            self._alterado = False
+
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            ids=np.array([i['id'] for i in itens], dtype=np.int64),
+            tipos=np.array([_CODIGO_TIPO[i['tipo']] for i in itens], dtype=np.int8),
+            datas=np.array([i['data_lancamento'] or '' for i in itens], dtype=str),
+            notas=np.array([i['nota'] or 0 for i in itens], dtype=np.float32),
+            titulos=np.array([i['titulo'] or '' for i in itens], dtype=str),
+            posters=np.array([i['poster_url'] or '' for i in itens], dtype=str),
+            generos_ids=np.array([','.join(map(str, i['generos_ids'])) for i in itens], dtype=str),
+            generos=np.array(['|'.join(i['generos']) for i in itens], dtype=str),
+        )
+        dados = buffer.getvalue()
+
+        temporario = f"{caminho}.tmp"
+        with open(temporario, 'wb') as arquivo:
+            arquivo.write(dados)
+        # Troca atômica para que ninguém leia um arquivo pela metade
+        os.replace(temporario, caminho)
+        self._mtime_arquivo = os.path.getmtime(caminho)
+
+        if cache.compartilhado():
+            # Processos em outras máquinas não enxergam o arquivo
+            versao = time.time()
+            cache.salvar(f"{CHAVE_CACHE}:dados", dados, TTL_CACHE)
+            cache.salvar(f"{CHAVE_CACHE}:versao", versao, TTL_CACHE)
+            self._versao_cache = versao
+        return True
+
+    def carregar(self, caminho=INDICE_ARQUIVO):
+        """Junta ao índice os itens salvos em `caminho` (caminho do .npz ou arquivo aberto)."""
+        with np.load(caminho) as dados:
+            itens = [
+                {
+                    'id': int(id_item),
+                    'tipo': TIPOS[codigo],
+                    'data_lancamento': str(data),
+                    'nota': float(nota),
+                    'titulo': str(titulo),
+                    'poster_url': str(poster) or None,
+                    'generos_ids': [int(g) for g in str(ids_generos).split(',') if g],
+                    'generos': [g for g in str(nomes_generos).split('|') if g],
+                }
+                for id_item, codigo, data, nota, titulo, poster, ids_generos, nomes_generos in zip(
+                    dados['ids'], dados['tipos'], dados['datas'], dados['notas'],
+                    dados['titulos'], dados['posters'], dados['generos_ids'], dados['generos']
+                )
+            ]
+        alterado = self._alterado
+        self.registrar(itens)
+        # O que veio do arquivo não precisa ser salvo de novo
+        self._alterado = alterado
+        return len(itens)
+
+    def recarregar_se_mudou(self):
+        """Junta ao índice o que outro processo publicou (arquivo ou cache), no máximo a cada INTERVALO_RECARGA."""
+        agora = time.time()
+        if agora - self._ultima_verificacao < INTERVALO_RECARGA:
+            return
+        self._ultima_verificacao = agora
+
+        try:
+            mtime = os.path.getmtime(INDICE_ARQUIVO)
+        except OSError:
+            mtime = 0
+
+        if mtime > self._mtime_arquivo:
+            self._mtime_arquivo = mtime
+            try:
+                self.carregar()
+            except Exception as e:
+                print(f"Erro ao carregar índice do catálogo: {e}")
+
+        if not cache.compartilhado():
+            return
+        versao = cache.obter(f"{CHAVE_CACHE}:versao")
+        if versao and versao > self._versao_cache:
+            self._versao_cache = versao
+            dados = cache.obter(f"{CHAVE_CACHE}:dados")
+            try:
+                if dados:
+                    self.carregar(io.BytesIO(dados))
+            except Exception as e:
+                print(f"Erro ao carregar índice do catálogo do cache: {e}")
+
+indice = IndiceCatalogo()
+
+def registrar(itens):
+    """Registra itens formatados no índice. Nunca deixa um erro aqui quebrar a busca original."""
+    try:
+        indice.registrar(itens)
+    except Exception as e:
+        print(f"Erro ao registrar itens no índice: {e}")
+    return itens
+
+def indexar(funcao):
+    """
+    Decorador para as funções de serviço com cache: registra no índice o que a função
+    devolve, tanto na chamada à API quanto na leitura do cache. Assim cada worker indexa
+    o que serve mesmo quando as listas vêm de um cache compartilhado.
+    Resultados em outro idioma não entram. Só vale para listas de tamanho limitado
+    (catálogo, gêneros, períodos); buscas livres fariam o índice crescer sem fim.
+    """
+    def _registrar(resultado, kwargs):
+        if resultado and kwargs.get('idioma', IDIOMA_INDICE) == IDIOMA_INDICE:
+            registrar(resultado)
+        return resultado
+
+    @wraps(funcao)
+    def envolvida(*args, **kwargs):
+        return _registrar(funcao(*args, **kwargs), kwargs)
+
+    # Atualizações do agendador também alimentam o índice
+    if hasattr(funcao, 'atualizar'):
+        envolvida.atualizar = lambda *args, **kwargs: _registrar(funcao.atualizar(*args, **kwargs), kwargs)
+    return envolvida
+
+def buscar_por_decada(decada, tipos=None, nota_minima=None, limite=40, ordenar='nota'):
+    """Ex: buscar_por_decada(1990, tipos=['movie', 'game']) -> destaques dos anos 90."""
+    return indice.buscar(decada, decada + 9, tipos, nota_minima, limite, ordenar)
+
+def buscar_por_ano(ano, tipos=None, nota_minima=None, limite=40, ordenar='nota'):
+    return indice.buscar(ano, ano, tipos, nota_minima, limite, ordenar)
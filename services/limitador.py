@@ -0,0 +1,179 @@
+"""
+Limitador de requisições (token bucket) para as APIs externas.
+
+Cada API (TMDB, RAWG, Steam) tem um balde de tokens compartilhado por todas as threads
+do processo. A taxa configurada é a da aplicação inteira e é dividida pelo número de
+workers do gunicorn (WEB_CONCURRENCY), para que somados eles não passem do limite.
+
+Quando não há token, a requisição espera numa fila limitada por no máximo alguns
+segundos; se a API responder 429, o balde é pausado pelo tempo do `Retry-After`.
+
+Cada processo (worker do gunicorn, agendador) imprime o próprio uso no log a cada
+LIMITADOR_INTERVALO_LOG segundos enquanto estiver fazendo requisições.
+"""
+import os
+import time
+import threading
+from email.utils import parsedate_to_datetime
+import requests
+
+WORKERS = max(1, int(os.environ.get('WEB_CONCURRENCY', 1)))
+
+# (requisições por segundo, rajada máxima) de cada API para a aplicação toda
+LIMITES = {
+    'tmdb': (float(os.environ.get('LIMITE_TMDB', 40)), 40),
+    'rawg': (float(os.environ.get('LIMITE_RAWG', 5)), 10),
+    'steam': (float(os.environ.get('LIMITE_STEAM', 0.6)), 5),  # ~200 a cada 5 minutos
+}
+
+ESPERA_MAXIMA = 5      # Segundos que uma requisição aceita esperar por um token
+MAX_NA_FILA = 50       # Requisições esperando ao mesmo tempo, por API
+RETRY_AFTER_PADRAO = 10
+INTERVALO_LOG = int(os.environ.get('LIMITADOR_INTERVALO_LOG', 300))  # 0 desliga
+
+class LimiteExcedido(requests.exceptions.RequestException):
+    """A requisição não conseguiu token dentro do tempo de espera (ou a fila estava cheia)."""
+
+class BaldeDeTokens:
+    """Token bucket seguro para várias threads."""
+
+    def __init__(self, nome, taxa, capacidade):
+        self.nome = nome
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.tokens = capacidade
+        self.ultima_recarga = time.monotonic()
+        self.pausado_ate = 0
+        self.na_fila = 0
+        self._condicao = threading.Condition()
+        self.metricas = {
+            'requisicoes': 0,
+            'respostas_429': 0,
+            'rejeitadas': 0,
+            'tempo_espera': 0.0,
+        }
+
+    def _recarregar(self, agora):
+        decorrido = agora - self.ultima_recarga
+        self.tokens = min(self.capacidade, self.tokens + decorrido * self.taxa)
+        self.ultima_recarga = agora
+
+    def adquirir(self, espera_maxima=ESPERA_MAXIMA):
+        """Pega um token, esperando no máximo `espera_maxima` segundos. Retorna True se conseguiu."""
+        inicio = time.monotonic()
+        limite = inicio + espera_maxima
+
+        with self._condicao:
+            if self.na_fila >= MAX_NA_FILA:
+                self.metricas['rejeitadas'] += 1
+                return False
+
+            self.na_fila += 1
+            try:
+                while True:
+                    agora = time.monotonic()
+                    self._recarregar(agora)
+
+                    if agora >= self.pausado_ate and self.tokens >= 1:
+                        self.tokens -= 1
+                        self.metricas['requisicoes'] += 1
+                        self.metricas['tempo_espera'] += agora - inicio
+                        return True
+
+                    # Tempo até o próximo token (ou até o fim da pausa por 429)
+                    falta = max(self.pausado_ate - agora, (1 - self.tokens) / self.taxa)
+                    if agora + falta > limite:
+                        self.metricas['rejeitadas'] += 1
+                        return False
+
+                    self._condicao.wait(falta)
+            finally:
+                self.na_fila -= 1
+
+    def pausar(self, segundos):
+        """Chamado quando a API responde 429: ninguém usa este balde até a pausa acabar."""
+        with self._condicao:
+            self.metricas['respostas_429'] += 1
+            self.pausado_ate = max(self.pausado_ate, time.monotonic() + segundos)
+            self.tokens = 0
+
+    def resumo(self):
+        with self._condicao:
+            self._recarregar(time.monotonic())
+            return dict(
+                self.metricas,
+                tempo_espera=round(self.metricas['tempo_espera'], 3),
+                tokens_disponiveis=round(self.tokens, 2),
+                taxa_por_segundo=self.taxa,
+                na_fila=self.na_fila,
+                pausado_por=round(max(0, self.pausado_ate - time.monotonic()), 1),
+            )
+
+_baldes = {
+    nome: BaldeDeTokens(nome, taxa / WORKERS, max(1, capacidade // WORKERS))
+    for nome, (taxa, capacidade) in LIMITES.items()
+}
+
+def _ler_retry_after(response):
+    """Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos."""
+    valor = response.headers.get('Retry-After')
+    if not valor:
+        return RETRY_AFTER_PADRAO
+    try:
+        return max(0, float(valor))
+    except ValueError:
+        pass
+    try:
+        return max(0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return RETRY_AFTER_PADRAO
+
+_ultimo_log = time.monotonic()
+_lock_log = threading.Lock()
+
+def _registrar_metricas_periodicamente():
+    """Imprime o uso dos baldes deste processo, no máximo uma vez a cada INTERVALO_LOG segundos."""
+    global _ultimo_log
+    if not INTERVALO_LOG:
+        return
+    with _lock_log:
+        agora = time.monotonic()
+        if agora - _ultimo_log < INTERVALO_LOG:
+            return
+        _ultimo_log = agora
+
+    uso = "; ".join(
+        f"{api} {m['requisicoes']} req, {m['respostas_429']} 429, {m['rejeitadas']} rejeitadas, {m['tempo_espera']}s esperando"
+        for api, m in metricas().items()
+    )
+    print(f"[limitador] pid {os.getpid()}: {uso}")
+
+def requisitar(api, url, params=None, timeout=None, espera_maxima=ESPERA_MAXIMA):
+    """
+    Faz um GET respeitando o limite da `api` ('tmdb', 'rawg' ou 'steam').
+
+    Se a API responder 429 e o Retry-After couber no tempo de espera, tenta mais uma vez.
+    Levanta LimiteExcedido (uma RequestException) se não conseguir token a tempo.
+    """
+    _registrar_metricas_periodicamente()
+    balde = _baldes[api]
+    limite = time.monotonic() + espera_maxima
+
+    for tentativa in range(2):
+        restante = max(0, limite - time.monotonic())
+        if not balde.adquirir(restante):
+            raise LimiteExcedido(f"Limite de requisições da API '{api}' atingido")
+
+        response = requests.get(url, params=params, timeout=timeout)
+        if response.status_code != 429:
+            return response
+
+        espera = _ler_retry_after(response)
+        balde.pausar(espera)
+        print(f"[limitador] {api} respondeu 429, pausando por {espera:.0f}s")
+
+    return response
+
+def metricas():
+    """Uso atual de cada API: requisições feitas, 429 recebidos, rejeitadas e tempo de espera."""
+    return {nome: balde.resumo() for nome, balde in _baldes.items()}
@@ -0,0 +1,102 @@
+"""
+Várias consultas de lista numa única requisição (ex: carrosséis da mesma página).
+
+Cada consulta tem um tipo (ver CONSULTAS) e seus parâmetros; todas rodam em paralelo
+pelas mesmas funções de serviço (e portanto pelo mesmo cache e limitador) e voltam
+juntas num só dicionário.
+
+Exposto em POST /api/lote (formato documentado no README). As páginas do site não usam
+a rota; ela é para clientes que montam várias listas de uma vez.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from services.api_tmdb import (
+    buscar_catalogo_filmes,
+    buscar_catalogo_series,
+    buscar_filmes_classicos,
+    buscar_series_nostalgia,
+    buscar_filmes_por_genero,
+    buscar_series_por_genero
+)
+from services.api_rawg import buscar_jogos_populares
+from services.catalogo_idiomas import localizar
+
+MAX_CONSULTAS = 10
+MAX_PAGINA = 500
+
+# tipo da consulta -> (função, parâmetros aceitos, se é do TMDB e pode ser traduzida)
+CONSULTAS = {
+    'filmes_populares': (buscar_catalogo_filmes, ('pagina',), True),
+    'series_populares': (buscar_catalogo_series, ('pagina',), True),
+    'filmes_classicos': (buscar_filmes_classicos, ('pagina',), True),
+    'series_nostalgia': (buscar_series_nostalgia, ('pagina',), True),
+    'filmes_genero': (buscar_filmes_por_genero, ('generos', 'pagina'), True),
+    'series_genero': (buscar_series_por_genero, ('generos', 'pagina'), True),
+    'jogos_populares': (buscar_jogos_populares, ('pagina',), False),
+}
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='lote')
+
+class ConsultaInvalida(ValueError):
+    """Consulta com tipo desconhecido ou parâmetros inválidos."""
+
+def _preparar(consulta):
+    """Valida uma consulta e devolve (função, kwargs, traduzível)."""
+    if not isinstance(consulta, dict) or consulta.get('tipo') not in CONSULTAS:
+        raise ConsultaInvalida(f"Tipo de consulta desconhecido: {consulta.get('tipo') if isinstance(consulta, dict) else consulta!r}")
+
+    funcao, aceitos, traduzivel = CONSULTAS[consulta['tipo']]
+    kwargs = {}
+    for nome in aceitos:
+        if nome not in consulta:
+            continue
+        if nome == 'pagina':
+            try:
+                kwargs['pagina'] = min(max(int(consulta['pagina']), 1), MAX_PAGINA)
+            except (TypeError, ValueError):
+                raise ConsultaInvalida("'pagina' deve ser um número")
+        else:
+            kwargs[nome] = str(consulta[nome])
+
+    if 'generos' in aceitos and not kwargs.get('generos'):
+        raise ConsultaInvalida("Informe 'generos' (ex: \"28,12\")")
+
+    return funcao, kwargs, traduzivel
+
+def executar_lote(consultas, idioma):
+    """
+    Executa as consultas em paralelo.
+
+    Args:
+        consultas: lista de dicionários como {'id': 'acao', 'tipo': 'filmes_genero', 'generos': '28', 'pagina': 1}.
+                   Sem 'id', a posição na lista é usada como chave.
+        idioma: idioma das consultas do TMDB
+
+    Returns:
+        {'resultados': {id: lista}, 'erros': {id: mensagem}}
+    """
+    resultados, erros, futuros = {}, {}, {}
+
+    for posicao, consulta in enumerate(consultas[:MAX_CONSULTAS]):
+        chave = str(consulta.get('id', posicao)) if isinstance(consulta, dict) else str(posicao)
+        try:
+            funcao, kwargs, traduzivel = _preparar(consulta)
+        except ConsultaInvalida as e:
+            erros[chave] = str(e)
+            continue
+
+        if traduzivel:
+            futuros[chave] = _executor.submit(localizar, funcao, idioma, **kwargs)
+        else:
+            futuros[chave] = _executor.submit(funcao, **kwargs)
+
+    for chave, futuro in futuros.items():
+        try:
+            resultados[chave] = futuro.result()
+        except Exception as e:
+            print(f"Erro na consulta '{chave}' do lote: {e}")
+            erros[chave] = 'Erro ao buscar dados.'
+
+    if len(consultas) > MAX_CONSULTAS:
+        erros['_lote'] = f"Apenas as primeiras {MAX_CONSULTAS} consultas foram executadas."
+
+    return {'resultados': resultados, 'erros': erros}
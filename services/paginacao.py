@@ -0,0 +1,67 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+from utils.cursor import codificar_cursor, decodificar_cursor
+
+ITENS_POR_PAGINA_TMDB = 20
+TOTAL_PAGINAS_TMDB = 500  # O TMDB não devolve páginas depois da 500
+
+# Quantas vezes buscar mais páginas quando quase tudo veio repetido
+MAX_RODADAS = 3
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='paginacao')
+
+def buscar_pagina_agregada(funcao_busca, cursor, tamanho, **kwargs):
+    """
+    Junta várias páginas do TMDB numa página maior, sem itens repetidos.
+
+    Args:
+        funcao_busca: função de serviço que aceita `pagina` (ex: buscar_catalogo_filmes)
+        cursor: token recebido do cliente (vazio na primeira chamada)
+        tamanho: quantidade aproximada de itens desejada
+        **kwargs: argumentos extras repassados para funcao_busca (ex: generos)
+
+    Returns:
+        (itens, proximo_cursor). proximo_cursor é None quando a lista acabou; se alguma
+        página falhou, ele aponta para ela, para que nada seja pulado.
+    """
+    pagina, ids_vistos = decodificar_cursor(cursor, ultima_pagina=TOTAL_PAGINAS_TMDB)
+    vistos = set(ids_vistos)
+    paginas_por_rodada = max(1, math.ceil(tamanho / ITENS_POR_PAGINA_TMDB))
+    total_paginas = TOTAL_PAGINAS_TMDB
+
+    itens = []
+    falhou = False
+
+    for _ in range(MAX_RODADAS):
+        paginas = range(pagina, min(pagina + paginas_por_rodada, total_paginas + 1))
+        if not paginas:
+            break
+
+        # Busca as páginas ao mesmo tempo; map mantém a ordem original
+        resultados = _executor.map(lambda p: funcao_busca(pagina=p, **kwargs), paginas)
+
+        for lista in resultados:
+            # O TMDB informa quantas páginas a consulta tem (ex: um gênero com poucos títulos)
+            total = getattr(lista, 'total_paginas', None)
+            if total:
+                total_paginas = min(total_paginas, total)
+            if not lista:
+                # Lista vazia antes do fim conhecido é erro (API fora, limite de requisições):
+                # para aqui, e o cursor volta a esta página na próxima chamada
+                falhou = pagina <= total_paginas
+                break
+            for item in lista:
+                if item['id'] not in vistos:
+                    vistos.add(item['id'])
+                    ids_vistos.append(item['id'])
+                    itens.append(item)
+            pagina += 1
+
+        # A ordem de popularidade muda entre chamadas, então algumas páginas
+        # podem vir quase todas repetidas. Só busca mais se faltou bastante.
+        if falhou or pagina > total_paginas or len(itens) >= tamanho // 2:
+            break
+
+    fim = not falhou and pagina > total_paginas
+    proximo_cursor = None if fim else codificar_cursor(pagina, ids_vistos)
+    return itens, proximo_cursor
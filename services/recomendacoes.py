@@ -0,0 +1,203 @@
+"""
+Recomendações de títulos parecidos (filme -> jogo, série -> filme...) calculadas localmente.
+
+Cada título do índice do catálogo vira um vetor de características (gêneros num vocabulário
+comum a TMDB e RAWG, década, nota e tipo de mídia) numa matriz numpy com linhas normalizadas.
+A similaridade de cosseno de vários títulos de uma vez é um único produto de matrizes,
+sem nenhuma chamada ao `/similar` do TMDB.
+
+O motor assina o índice do catálogo: títulos novos entram na matriz de forma incremental.
+"""
+import threading
+import numpy as np
+from services.indice_catalogo import indice, TIPOS
+
+# Vocabulário comum de gêneros entre filmes, séries e jogos
+GENEROS = [
+    'acao', 'aventura', 'animacao', 'comedia', 'crime', 'documentario', 'drama', 'familia',
+    'fantasia', 'ficcao', 'historia', 'terror', 'musica', 'misterio', 'romance', 'suspense',
+    'guerra', 'faroeste', 'esporte', 'estrategia', 'simulacao',
+]
+
+# IDs de gênero do TMDB (filmes e séries) -> vocabulário comum
+_GENEROS_TMDB = {
+    28: ['acao'], 12: ['aventura'], 16: ['animacao'], 35: ['comedia'], 80: ['crime'],
+    99: ['documentario'], 18: ['drama'], 10751: ['familia'], 14: ['fantasia'], 36: ['historia'],
+    27: ['terror'], 10402: ['musica'], 9648: ['misterio'], 10749: ['romance'], 878: ['ficcao'],
+    53: ['suspense'], 10752: ['guerra'], 37: ['faroeste'],
+    10759: ['acao', 'aventura'], 10762: ['familia', 'animacao'], 10763: ['documentario'],
+    10765: ['ficcao', 'fantasia'], 10766: ['drama', 'romance'], 10768: ['guerra', 'historia'],
+}
+
+# Nomes de gênero da RAWG -> vocabulário comum
+_GENEROS_RAWG = {
+    'Action': ['acao'], 'Adventure': ['aventura'], 'RPG': ['fantasia', 'aventura'],
+    'Shooter': ['acao', 'guerra'], 'Strategy': ['estrategia', 'guerra'], 'Puzzle': ['misterio'],
+    'Racing': ['esporte'], 'Sports': ['esporte'], 'Simulation': ['simulacao'],
+    'Platformer': ['aventura', 'familia'], 'Fighting': ['acao'], 'Family': ['familia'],
+    'Arcade': ['acao'], 'Casual': ['familia'], 'Board Games': ['familia', 'estrategia'],
+    'Card': ['estrategia'], 'Educational': ['documentario'],
+}
+
+DECADAS = list(range(1950, 2030, 10))  # Antes de 1950 cai na primeira, depois de 2020 na última
+
+# Peso de cada grupo de características no cosseno
+PESO_GENEROS = 1.0
+PESO_DECADA = 0.7
+PESO_NOTA = 0.3
+PESO_TIPO = 0.3
+
+_INDICE_GENERO = {genero: posicao for posicao, genero in enumerate(GENEROS)}
+_INICIO_DECADA = len(GENEROS)
+_POSICAO_NOTA = _INICIO_DECADA + len(DECADAS)
+_INICIO_TIPO = _POSICAO_NOTA + 1
+DIMENSAO = _INICIO_TIPO + len(TIPOS)
+
+def _generos_do_item(item):
+    generos = set()
+    for id_genero in item.get('generos_ids') or []:
+        generos.update(_GENEROS_TMDB.get(id_genero, []))
+    for nome in item.get('generos') or []:
+        generos.update(_GENEROS_RAWG.get(nome, []))
+    return generos
+
+def codificar(item):
+    """Vetor de características (normalizado) de um título."""
+    vetor = np.zeros(DIMENSAO, dtype=np.float32)
+
+    generos = _generos_do_item(item)
+    for genero in generos:
+        # Divide o peso para que títulos com muitos gêneros não dominem
+        vetor[_INDICE_GENERO[genero]] = PESO_GENEROS / np.sqrt(len(generos))
+
+    try:
+        ano = int(str(item.get('data_lancamento'))[:4])
+        posicao = min(max((ano - DECADAS[0]) // 10, 0), len(DECADAS) - 1)
+        vetor[_INICIO_DECADA + posicao] = PESO_DECADA
+    except ValueError:
+        pass
+
+    nota = item.get('nota') or 0
+    if item.get('tipo') == 'game':
+        nota /= 10
+    vetor[_POSICAO_NOTA] = PESO_NOTA * min(nota / 10, 1)
+
+    if item.get('tipo') in TIPOS:
+        vetor[_INICIO_TIPO + TIPOS.index(item['tipo'])] = PESO_TIPO
+
+    norma = np.linalg.norm(vetor)
+    return vetor / norma if norma else vetor
+
+class MotorRecomendacao:
+    """Matriz de vetores dos títulos conhecidos, que cresce conforme o índice recebe novidades."""
+
+    def __init__(self, capacidade_inicial=1024, indice_catalogo=None):
+        # Índice consultado antes de cada recomendação, para receber o que outros processos publicaram
+        self.indice_catalogo = indice_catalogo
+        self._lock = threading.Lock()
+        self._matriz = np.zeros((capacidade_inicial, DIMENSAO), dtype=np.float32)
+        self._tipos = np.zeros(capacidade_inicial, dtype=np.int8)
+        self._total = 0
+        self._linhas = {}     # (tipo, id) -> linha da matriz
+        self._itens = []      # Item de cada linha
+        self._pendentes = {}  # Itens recebidos e ainda não codificados
+
+    def atualizar(self, itens):
+        """Recebe itens novos ou alterados. A codificação fica para a próxima consulta."""
+        with self._lock:
+            for item in itens:
+                self._pendentes[(item['tipo'], item['id'])] = item
+
+    def _aplicar_pendentes(self):
+        """Codifica os pendentes e grava na matriz. Chamado com o lock já adquirido."""
+        if not self._pendentes:
+            return
+
+        novos = [chave for chave in self._pendentes if chave not in self._linhas]
+        necessario = self._total + len(novos)
+        if necessario > len(self._matriz):
+            # Dobra a capacidade para que inserções somem custo amortizado constante
+            capacidade = max(necessario, len(self._matriz) * 2)
+            self._matriz = np.resize(self._matriz, (capacidade, DIMENSAO))
+            self._tipos = np.resize(self._tipos, capacidade)
+
+        for chave, item in self._pendentes.items():
+            linha = self._linhas.get(chave)
+            if linha is None:
+                linha = self._total
+                self._linhas[chave] = linha
+                self._itens.append(item)
+                self._total += 1
+            else:
+                self._itens[linha] = item
+            self._matriz[linha] = codificar(item)
+            self._tipos[linha] = TIPOS.index(item['tipo'])
+
+        self._pendentes.clear()
+
+    def similares(self, chaves, k=12, tipos=None):
+        """
+        Top-k títulos mais parecidos para cada chave (tipo, id), calculados juntos.
+
+        Args:
+            chaves: lista de (tipo, id)
+            tipos: restringe as recomendações a esses tipos (ex: ['game'] para filme -> jogo)
+
+        Returns:
+            {(tipo, id): [item, ...]} com o campo 'similaridade' em cada item.
+            Títulos que não estão no índice recebem lista vazia.
+        """
+        if self.indice_catalogo is not None:
+            # Fora do lock: a recarga chama atualizar() pelos ouvintes do índice
+            self.indice_catalogo.recarregar_se_mudou()
+
+        with self._lock:
+            self._aplicar_pendentes()
+            matriz = self._matriz[:self._total]
+            tipos_linhas = self._tipos[:self._total]
+            itens = self._itens[:self._total]
+            linhas = [self._linhas.get(chave) for chave in chaves]
+
+        resposta = {chave: [] for chave in chaves}
+        conhecidas = [(chave, linha) for chave, linha in zip(chaves, linhas) if linha is not None]
+        if not conhecidas or len(matriz) < 2:
+            return resposta
+
+        # Linhas já normalizadas: o cosseno é só o produto escalar
+        consultas = np.array([linha for _, linha in conhecidas])
+        pontuacoes = matriz[consultas] @ matriz.T
+
+        # O próprio título não conta
+        pontuacoes[np.arange(len(consultas)), consultas] = -np.inf
+        if tipos:
+            codigos = [TIPOS.index(tipo) for tipo in tipos if tipo in TIPOS]
+            pontuacoes[:, ~np.isin(tipos_linhas, codigos)] = -np.inf
+
+        k = max(1, min(k, pontuacoes.shape[1]))
+        # argpartition pega os k maiores sem ordenar a linha inteira
+        melhores = np.argpartition(-pontuacoes, k - 1, axis=1)[:, :k]
+
+        for posicao, (chave, _) in enumerate(conhecidas):
+            candidatos = melhores[posicao]
+            notas = pontuacoes[posicao, candidatos]
+            ordem = np.argsort(-notas)
+            resposta[chave] = [
+                dict(itens[candidatos[i]], similaridade=round(float(notas[i]), 4))
+                for i in ordem if np.isfinite(notas[i])
+            ]
+
+        return resposta
+
+motor = MotorRecomendacao(indice_catalogo=indice)
+
+# Começa com o que o índice já conhece e passa a receber cada título novo
+indice.ouvintes.append(motor.atualizar)
+motor.atualizar(indice.todos())
+
+def recomendar(tipo, id_item, k=12, tipos=None):
+    """Títulos parecidos com um único título."""
+    return motor.similares([(tipo, id_item)], k, tipos)[(tipo, id_item)]
+
+def recomendar_varios(chaves, k=12, tipos=None):
+    """Títulos parecidos com vários títulos de uma vez (ex: todos os itens de uma página)."""
+    return motor.similares(chaves, k, tipos)
@@ -0,0 +1,32 @@
+-- Tabela dos arquivos nostalgia de cada usuário (usada por utils/csv_handler.py).
+-- Rodar no SQL Editor do Supabase.
+
+create table if not exists public.arquivos_nostalgia (
+    id bigint generated always as identity primary key,
+    usuario_id uuid not null references auth.users (id) on delete cascade,
+    midia_id bigint not null,                  -- ID no TMDB (filmes/séries) ou na RAWG (jogos)
+    tipo text not null check (tipo in ('movie', 'tv', 'game')),
+    titulo text not null,
+    ano text,
+    poster_url text,
+    comentario text,
+    criado_em timestamptz not null default now(),
+
+    -- Chave do upsert da importação (on_conflict='usuario_id,midia_id,tipo'):
+    -- importar a mesma planilha de novo atualiza em vez de duplicar
+    constraint arquivos_nostalgia_usuario_midia_unico unique (usuario_id, midia_id, tipo)
+);
+
+-- A exportação lê por usuário em ordem de id
+create index if not exists arquivos_nostalgia_usuario_id_idx
+    on public.arquivos_nostalgia (usuario_id, id);
+
+-- Cada usuário só enxerga e altera o próprio arquivo. A importação e a exportação do app
+-- usam a chave service role (SUPABASE_SERVICE_ROLE_KEY), que não passa por esta política:
+-- rodam fora da sessão do usuário e filtram por usuario_id no código.
+alter table public.arquivos_nostalgia enable row level security;
+
+create policy "arquivos_nostalgia_do_usuario" on public.arquivos_nostalgia
+    for all
+    using (auth.uid() = usuario_id)
+    with check (auth.uid() = usuario_id);
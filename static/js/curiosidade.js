@@ -0,0 +1,34 @@
+// Elemento que recebe a curiosidade (tem a URL do stream em data-url)
+const areaCuriosidade = document.getElementById('curiosidade-stream');
+
+/**
+ * Abre o stream SSE e vai escrevendo a curiosidade conforme o Gemini gera
+ */
+function carregarCuriosidade() {
+    const fonte = new EventSource(areaCuriosidade.dataset.url);
+    let recebeuTexto = false;
+
+    fonte.onmessage = function(evento) {
+        if (!recebeuTexto) {
+            areaCuriosidade.textContent = '';
+            recebeuTexto = true;
+        }
+        areaCuriosidade.textContent += JSON.parse(evento.data);
+    };
+
+    // Fim normal: fecha para o navegador não reconectar
+    fonte.addEventListener('fim', function() {
+        fonte.close();
+    });
+
+    fonte.onerror = function() {
+        fonte.close();
+        if (!recebeuTexto) {
+            areaCuriosidade.textContent = 'Dados confidenciais corrompidos. Tente novamente mais tarde.';
+        }
+    };
+}
+
+if (areaCuriosidade) {
+    carregarCuriosidade();
+}
@@ -0,0 +1,112 @@
+// Elementos do DOM
+const formExplorar = document.getElementById('form-explorar');
+const campoExplorar = document.getElementById('campo-explorar');
+const gradeResultados = document.getElementById('resultados-explorar');
+const statusExplorar = document.getElementById('status-explorar');
+
+// Todos os itens recebidos até agora, mantidos em ordem de relevância
+let resultados = [];
+
+// Busca em andamento; cancelada quando outra começa, para os blocos dela não se misturarem
+let controladorBusca = null;
+
+/**
+ * Cria o HTML de um resultado (filme, série ou jogo)
+ */
+function criarItem(item) {
+    const divPoster = document.createElement('div');
+    divPoster.className = 'item-poster';
+
+    const link = document.createElement('a');
+    link.href = `/detalhes/${item.tipo}/${item.id}`;
+
+    if (item.poster_url) {
+        const img = document.createElement('img');
+        img.src = item.poster_url;
+        img.alt = item.titulo;
+        img.loading = 'lazy';
+        link.appendChild(img);
+    } else {
+        link.textContent = item.titulo;
+    }
+
+    divPoster.appendChild(link);
+    return divPoster;
+}
+
+/**
+ * Intercala os itens de uma nova fonte com os que já estão na tela,
+ * usando a relevância calculada pelo servidor
+ */
+function adicionarResultados(itens) {
+    resultados = resultados.concat(itens);
+    resultados.sort((a, b) => b.relevancia - a.relevancia);
+
+    gradeResultados.innerHTML = '';
+    resultados.forEach(item => gradeResultados.appendChild(criarItem(item)));
+}
+
+/**
+ * Lê a resposta em NDJSON linha a linha, mostrando cada fonte assim que ela chega
+ */
+async function explorar(query) {
+    if (controladorBusca) controladorBusca.abort();
+    const controlador = new AbortController();
+    controladorBusca = controlador;
+
+    resultados = [];
+    gradeResultados.innerHTML = '';
+    statusExplorar.textContent = 'Buscando...';
+
+    try {
+        const response = await fetch(`/api/explorar?q=${encodeURIComponent(query)}`, { signal: controlador.signal });
+        const leitor = response.body.getReader();
+        const decodificador = new TextDecoder();
+        let pendente = '';
+
+        while (true) {
+            const { value, done } = await leitor.read();
+            if (done || controlador.signal.aborted) break;
+
+            pendente += decodificador.decode(value, { stream: true });
+            const linhas = pendente.split('\n');
+            pendente = linhas.pop();  // A última pode estar incompleta
+
+            for (const linha of linhas) {
+                if (!linha.trim()) continue;
+                const bloco = JSON.parse(linha);
+
+                if (bloco.fim) {
+                    statusExplorar.textContent = bloco.total === 0 ? 'Nenhum resultado encontrado.' : '';
+                } else {
+                    adicionarResultados(bloco.itens);
+                    statusExplorar.textContent = 'Buscando mais resultados...';
+                }
+            }
+        }
+    } catch (error) {
+        // Cancelada por uma busca mais nova: a tela já é dela
+        if (error.name === 'AbortError') return;
+        console.error('Erro ao explorar:', error);
+        statusExplorar.textContent = 'Erro ao buscar. Tente novamente.';
+    }
+}
+
+// --- EVENT LISTENERS ---
+
+if (formExplorar) {
+    formExplorar.addEventListener('submit', function(evento) {
+        evento.preventDefault();
+        const query = campoExplorar.value.trim();
+        if (!query) return;
+
+        // Atualiza a URL para a busca poder ser compartilhada
+        history.replaceState(null, '', `?q=${encodeURIComponent(query)}`);
+        explorar(query);
+    });
+
+    // Se a página já abriu com uma busca (vinda da home), executa
+    if (campoExplorar.value.trim()) {
+        explorar(campoExplorar.value.trim());
+    }
+}
@@ -1,5 +1,5 @@
 // Controle de estado
-let paginaAtual = 1;
+let cursorAtual = null;  // Token do servidor com a próxima página e os IDs já exibidos
 let generosSelecionados = '';  // Guarda os gêneros do filtro ativo
 
 // Elementos do DOM
@@ -8,6 +8,11 @@ const gradePosters = document.querySelector('.grade-posters');
 const btnBuscarFiltro = document.getElementById('btn-buscar-filtro');
 const formFiltros = document.getElementById('form-filtros');
 
+// A primeira página vem renderizada pelo servidor junto com o cursor para continuar
+if (gradePosters) {
+    cursorAtual = gradePosters.dataset.cursor || '';
+}
+
 /**
  * Cria o HTML de um poster e adiciona na grade
  */
@@ -16,7 +21,7 @@ function criarPoster(filme) {
         const divPoster = document.createElement('div');
         divPoster.className = 'item-poster';
         divPoster.innerHTML = `
-            <a href="#">
+            <a href="/detalhes/movie/${filme.id}">
                 <img src="${filme.poster_url}" alt="${filme.titulo}" loading="lazy">
             </a>
         `;
@@ -43,15 +48,27 @@ function coletarGenerosSelecionados() {
 /**
  * Busca filmes (com ou sem filtro) e atualiza a grade
  */
-async function buscarFilmes(pagina, generos, substituir = false) {
+async function buscarFilmes(cursor, generos, substituir = false) {
     try {
-        let url = `/api/filmes/filtrar?pagina=${pagina}`;
+        let url = `/api/filmes/filtrar?cursor=${encodeURIComponent(cursor)}`;
         if (generos) {
             url += `&generos=${generos}`;
         }
 
         const response = await fetch(url);
-        const filmes = await response.json();
+        const dados = await response.json();
+        const filmes = dados.itens;
+        cursorAtual = dados.cursor;
+
+        // Nada veio mas o cursor continua: a API falhou e dá para tentar a mesma página de novo
+        if (filmes.length === 0 && cursorAtual) {
+            if (substituir) {
+                limparGrade();
+            }
+            botaoVerMais.textContent = 'Erro - Tentar novamente';
+            botaoVerMais.disabled = false;
+            return;
+        }
 
         if (filmes.length === 0) {
             if (substituir) {
@@ -70,6 +87,13 @@ async function buscarFilmes(pagina, generos, substituir = false) {
         // Adiciona os filmes na grade
         filmes.forEach(filme => criarPoster(filme));
 
+        // Sem cursor o servidor avisou que a lista acabou
+        if (!cursorAtual) {
+            botaoVerMais.textContent = 'Fim da lista';
+            botaoVerMais.disabled = true;
+            return;
+        }
+
         // Reativa o botão
         botaoVerMais.disabled = false;
         botaoVerMais.textContent = 'Ver mais';
@@ -89,16 +113,14 @@ if (botaoVerMais) {
         botaoVerMais.disabled = true;
         botaoVerMais.textContent = 'Carregando...';
         
-        paginaAtual++;
-        await buscarFilmes(paginaAtual, generosSelecionados, false);
+        await buscarFilmes(cursorAtual, generosSelecionados, false);
     });
 }
 
 // Botão "BUSCAR" do filtro - Aplica os filtros selecionados
 if (btnBuscarFiltro) {
     btnBuscarFiltro.addEventListener('click', async function() {
-        // Reseta para página 1 quando aplica novo filtro
-        paginaAtual = 1;
+        // Novo filtro começa do zero (cursor vazio)
         generosSelecionados = coletarGenerosSelecionados();
         
         // Feedback visual
@@ -106,7 +128,7 @@ if (btnBuscarFiltro) {
         btnBuscarFiltro.disabled = true;
 
         // Busca com os novos filtros (substituir = true)
-        await buscarFilmes(paginaAtual, generosSelecionados, true);
+        await buscarFilmes('', generosSelecionados, true);
 
         // Restaura o botão
         btnBuscarFiltro.textContent = 'BUSCAR';
@@ -1,5 +1,5 @@
 // Controle de estado
-let paginaAtual = 1;
+let cursorAtual = null;  // Token do servidor com a próxima página e os IDs já exibidos
 let generosSelecionados = '';
 
 // Elementos do DOM
@@ -8,6 +8,11 @@ const gradePosters = document.querySelector('.grade-posters');
 const btnBuscarFiltro = document.getElementById('btn-buscar-filtro');
 const formFiltros = document.getElementById('form-filtros');
 
+// A primeira página vem renderizada pelo servidor junto com o cursor para continuar
+if (gradePosters) {
+    cursorAtual = gradePosters.dataset.cursor || '';
+}
+
 /**
  * Cria o HTML de um poster e adiciona na grade
  */
@@ -16,7 +21,7 @@ function criarPoster(serie) {
         const divPoster = document.createElement('div');
         divPoster.className = 'item-poster';
         divPoster.innerHTML = `
-            <a href="#">
+            <a href="/detalhes/tv/${serie.id}">
                 <img src="${serie.poster_url}" alt="${serie.titulo}" loading="lazy">
             </a>
         `;
@@ -43,15 +48,27 @@ function coletarGenerosSelecionados() {
 /**
  * Busca séries (com ou sem filtro) e atualiza a grade
  */
-async function buscarSeries(pagina, generos, substituir = false) {
+async function buscarSeries(cursor, generos, substituir = false) {
     try {
-        let url = `/api/series/filtrar?pagina=${pagina}`;
+        let url = `/api/series/filtrar?cursor=${encodeURIComponent(cursor)}`;
         if (generos) {
             url += `&generos=${generos}`;
         }
 
         const response = await fetch(url);
-        const series = await response.json();
+        const dados = await response.json();
+        const series = dados.itens;
+        cursorAtual = dados.cursor;
+
+        // Nada veio mas o cursor continua: a API falhou e dá para tentar a mesma página de novo
+        if (series.length === 0 && cursorAtual) {
+            if (substituir) {
+                limparGrade();
+            }
+            botaoVerMais.textContent = 'Erro - Tentar novamente';
+            botaoVerMais.disabled = false;
+            return;
+        }
 
         if (series.length === 0) {
             if (substituir) {
@@ -70,6 +87,13 @@ async function buscarSeries(pagina, generos, substituir = false) {
         // Adiciona as séries na grade
         series.forEach(serie => criarPoster(serie));
 
+        // Sem cursor o servidor avisou que a lista acabou
+        if (!cursorAtual) {
+            botaoVerMais.textContent = 'Fim da lista';
+            botaoVerMais.disabled = true;
+            return;
+        }
+
         // Reativa o botão
         botaoVerMais.disabled = false;
         botaoVerMais.textContent = 'Ver mais';
@@ -89,21 +113,19 @@ if (botaoVerMais) {
         botaoVerMais.disabled = true;
         botaoVerMais.textContent = 'Carregando...';
         
-        paginaAtual++;
-        await buscarSeries(paginaAtual, generosSelecionados, false);
+        await buscarSeries(cursorAtual, generosSelecionados, false);
     });
 }
 
 // Botão "BUSCAR" do filtro - Aplica os filtros selecionados
 if (btnBuscarFiltro) {
     btnBuscarFiltro.addEventListener('click', async function() {
-        paginaAtual = 1;
         generosSelecionados = coletarGenerosSelecionados();
         
         btnBuscarFiltro.textContent = 'Buscando...';
         btnBuscarFiltro.disabled = true;
 
-        await buscarSeries(paginaAtual, generosSelecionados, true);
+        await buscarSeries('', generosSelecionados, true);
 
         btnBuscarFiltro.textContent = 'BUSCAR';
         btnBuscarFiltro.disabled = false;
@@ -0,0 +1,270 @@
+"""
+Pipeline dos arquivos estáticos (CSS e JS).
+
+`flask construir-assets` minifica cada arquivo, gera um nome com o hash do conteúdo
+(ex: css/style.3f9a1c2b7d.css) e grava versões pré-comprimidas (.gz e, se o pacote
+`brotli` estiver instalado, .br) em static/dist, junto com um manifest.json.
+
+Com o manifest presente, url_for('static', filename='css/style.css') passa a apontar
+para a versão com hash, que é servida já comprimida e com cache imutável de um ano.
+Sem o manifest (ex: em desenvolvimento), tudo funciona como antes.
+"""
+import os
+import re
+import gzip
+import json
+import shutil
+import hashlib
+import mimetypes
+from flask import request, send_from_directory
+
+try:
+    import brotli  # Opcional: sem ele, só gzip
+except ImportError:
+    brotli = None
+
+PASTA_DIST = 'dist'
+ARQUIVO_MANIFEST = 'manifest.json'
+EXTENSOES = ('.css', '.js')
+UM_ANO = 365 * 24 * 60 * 60
+
+# Strings e comentários do CSS, na ordem em que aparecem (o que vier primeiro ganha)
+_TOKENS_CSS = re.compile(r'("(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|/\*.*?\*/)', re.S)
+
+def minificar_css(conteudo):
+    """
+    Remove comentários e espaços desnecessários do CSS.
+    Strings (ex: `content: ' : '`) ficam de fora: saem antes da minificação e voltam intactas.
+    """
+    strings = []
+    def guardar(encontrado):
+        trecho = encontrado.group(0)
+        if trecho.startswith('/*'):
+            return ' '
+        strings.append(trecho)
+        return f"\0{len(strings) - 1}\0"
+
+    conteudo = _TOKENS_CSS.sub(guardar, conteudo)
+    conteudo = re.sub(r'\s+', ' ', conteudo)
+    conteudo = re.sub(r'\s*([{};,>])\s*', r'\1', conteudo)
+    # Espaço antes de ':' fica (em seletores como `.menu :hover` ele tem significado)
+    conteudo = re.sub(r':\s+', ':', conteudo)
+    conteudo = conteudo.replace(';}', '}')
+    conteudo = re.sub(r'\0(\d+)\0', lambda m: strings[int(m.group(1))], conteudo)
+    return conteudo.strip()
+
+# Depois destas palavras, '/' abre uma regex; depois de outros nomes, é divisão
+_PALAVRAS_ANTES_DE_REGEX = {
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+    'throw', 'case', 'do', 'else', 'yield', 'await'
+}
+
+def _fim_string(conteudo, inicio, aspa):
+    """Posição logo depois da string que começa em `inicio` (ou da quebra de linha, se não fechar)."""
+    i = inicio + 1
+    while i < len(conteudo):
+        if conteudo[i] == '\\':
+            i += 2
+            continue
+        if conteudo[i] == aspa:
+            return i + 1
+        if conteudo[i] == '\n':
+            return i
+        i += 1
+    return len(conteudo)
+
+def _fim_template(conteudo, inicio):
+    """
+    Avança por um trecho de template literal (a partir da crase ou do '}' que fecha um `${`).
+    Retorna (posição final, True se parou num `${`, False se na crase de fechamento).
+    """
+    i = inicio + 1
+    while i < len(conteudo):
+        if conteudo[i] == '\\':
+            i += 2
+            continue
+        if conteudo[i] == '`':
+            return i + 1, False
+        if conteudo.startswith('${', i):
+            return i + 2, True
+        i += 1
+    return len(conteudo), False
+
+def _fim_regex(conteudo, inicio):
+    """Posição logo depois da regex literal que começa em `inicio`, ou None se não for uma."""
+    i = inicio + 1
+    em_classe = False
+    while i < len(conteudo):
+        caractere = conteudo[i]
+        if caractere == '\\':
+            i += 2
+            continue
+        if caractere == '\n':
+            return None
+        if caractere == '[':
+            em_classe = True
+        elif caractere == ']':
+            em_classe = False
+        elif caractere == '/' and not em_classe:
+            i += 1
+            while i < len(conteudo) and conteudo[i].isalpha():
+                i += 1
+            return i
+        i += 1
+    return None
+
+def _regex_pode_comecar(saida):
+    """Olha o código já escrito para decidir se um '/' abre uma regex ou é uma divisão."""
+    anterior = ''.join(saida[-20:]).rstrip()
+    if not anterior:
+        return True
+    palavra = re.search(r'[\w$]+$', anterior)
+    if palavra:
+        return palavra.group(0) in _PALAVRAS_ANTES_DE_REGEX
+    return anterior[-1] not in ')]}'
+
+def _adicionar_espaco(saida, quebra):
+    """Espaço em branco no código vira no máximo um espaço ou uma quebra de linha (sem linhas vazias)."""
+    if saida and saida[-1] == ' ':
+        if not quebra:
+            return
+        saida.pop()
+    if not saida or saida[-1] == '\n':
+        return
+    saida.append('\n' if quebra else ' ')
+
+def minificar_js(conteudo):
+    """
+    Minificação conservadora do JS: tira comentários, indentação e linhas vazias.
+    As quebras de linha ficam (por causa da inserção automática de ';'), e strings,
+    template literals e regex são copiados sem alteração.
+    """
+    saida = []
+    # Chaves abertas dentro de cada `${ }` de template literal ainda não fechado
+    templates = []
+    i = 0
+    while i < len(conteudo):
+        caractere = conteudo[i]
+        proximo = conteudo[i + 1:i + 2]
+
+        if caractere in '\'"':
+            fim = _fim_string(conteudo, i, caractere)
+        elif caractere == '`' or (caractere == '}' and templates and templates[-1] == 0):
+            if caractere == '}':
+                templates.pop()
+            fim, abriu_expressao = _fim_template(conteudo, i)
+            if abriu_expressao:
+                templates.append(0)
+        elif caractere == '/' and proximo == '/':
+            fim = conteudo.find('\n', i)
+            i = len(conteudo) if fim == -1 else fim
+            continue
+        elif caractere == '/' and proximo == '*':
+            fim = conteudo.find('*/', i + 2)
+            fim = len(conteudo) if fim == -1 else fim + 2
+            _adicionar_espaco(saida, '\n' in conteudo[i:fim])
+            i = fim
+            continue
+        elif caractere == '/' and _regex_pode_comecar(saida) and _fim_regex(conteudo, i):
+            fim = _fim_regex(conteudo, i)
+        elif caractere in ' \t\r\n':
+            _adicionar_espaco(saida, caractere == '\n')
+            i += 1
+            continue
+        else:
+            if templates and caractere == '{':
+                templates[-1] += 1
+            elif templates and caractere == '}':
+                templates[-1] -= 1
+            fim = i + 1
+
+        saida.append(conteudo[i:fim])
+        i = fim
+
+    return ''.join(saida).strip() + '\n'
+
+def _listar_arquivos(pasta_static):
+    for raiz, pastas, arquivos in os.walk(pasta_static):
+        # Não reprocessa o que já foi gerado
+        pastas[:] = [p for p in pastas if os.path.join(raiz, p) != os.path.join(pasta_static, PASTA_DIST)]
+        for nome in sorted(arquivos):
+            if nome.endswith(EXTENSOES):
+                caminho = os.path.join(raiz, nome)
+                yield os.path.relpath(caminho, pasta_static).replace(os.sep, '/')
+
+def construir(pasta_static):
+    """
+    Gera static/dist e o manifest. Retorna o manifest {original: versão com hash}.
+    """
+    pasta_dist = os.path.join(pasta_static, PASTA_DIST)
+    shutil.rmtree(pasta_dist, ignore_errors=True)
+
+    manifest = {}
+    for relativo in _listar_arquivos(pasta_static):
+        with open(os.path.join(pasta_static, relativo), encoding='utf-8') as arquivo:
+            conteudo = arquivo.read()
+
+        minificado = minificar_css(conteudo) if relativo.endswith('.css') else minificar_js(conteudo)
+        dados = minificado.encode('utf-8')
+
+        base, extensao = os.path.splitext(relativo)
+        digest = hashlib.sha256(dados).hexdigest()[:10]
+        destino = f"{PASTA_DIST}/{base}.{digest}{extensao}"
+        caminho_destino = os.path.join(pasta_static, destino)
+        os.makedirs(os.path.dirname(caminho_destino), exist_ok=True)
+
+        with open(caminho_destino, 'wb') as arquivo:
+            arquivo.write(dados)
+        # mtime=0 deixa o .gz idêntico entre builds do mesmo conteúdo
+        with gzip.GzipFile(caminho_destino + '.gz', 'wb', compresslevel=9, mtime=0) as arquivo:
+            arquivo.write(dados)
+        if brotli:
+            with open(caminho_destino + '.br', 'wb') as arquivo:
+                arquivo.write(brotli.compress(dados, quality=11))
+
+        manifest[relativo] = destino
+
+    with open(os.path.join(pasta_dist, ARQUIVO_MANIFEST), 'w', encoding='utf-8') as arquivo:
+        json.dump(manifest, arquivo, indent=2, sort_keys=True)
+
+    return manifest
+
+def carregar_manifest(pasta_static):
+    try:
+        with open(os.path.join(pasta_static, PASTA_DIST, ARQUIVO_MANIFEST), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return {}
+
+def init_app(app):
+    """Liga o manifest ao url_for e troca a rota 'static' por uma que serve as versões comprimidas."""
+    manifest = carregar_manifest(app.static_folder)
+    versoes = set(manifest.values())
+    servir_original = app.view_functions['static']
+
+    @app.url_defaults
+    def usar_versao_com_hash(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in manifest:
+            values['filename'] = manifest[values['filename']]
+
+    def servir_estatico(filename):
+        if filename not in versoes:
+            return servir_original(filename=filename)
+
+        aceitas = request.accept_encodings
+        mimetype = mimetypes.guess_type(filename)[0]
+        for codificacao, extensao in (('br', '.br'), ('gzip', '.gz')):
+            if aceitas[codificacao] and os.path.exists(os.path.join(app.static_folder, filename + extensao)):
+                resposta = send_from_directory(app.static_folder, filename + extensao, mimetype=mimetype, max_age=UM_ANO)
+                resposta.headers['Content-Encoding'] = codificacao
+                break
+        else:
+            resposta = send_from_directory(app.static_folder, filename, mimetype=mimetype, max_age=UM_ANO)
+
+        # O nome muda quando o conteúdo muda, então o navegador nunca precisa revalidar
+        resposta.headers['Cache-Control'] = f'public, max-age={UM_ANO}, immutable'
+        resposta.headers['Vary'] = 'Accept-Encoding'
+        return resposta
+
+    app.view_functions['static'] = servir_estatico
+    return manifest
@@ -0,0 +1,305 @@
+"""
+Importação e exportação dos arquivos nostalgia em CSV.
+
+A importação roda em segundo plano (iniciar_importacao): lê o arquivo linha a linha (sem
+carregar tudo na memória), resolve os títulos no TMDB/RAWG em lotes paralelos e grava no
+Supabase com upserts em blocos. O andamento fica no cache (estado_importacao); com mais de
+um worker, o cache precisa ser compartilhado (CACHE_BACKEND=sqlite ou redis).
+A exportação devolve um gerador de linhas CSV para ser usado numa resposta em streaming.
+
+A tabela usada está em sql/arquivos_nostalgia.sql. As duas funções recebem um cliente com a
+chave service role (o RLS não vale para ele), por isso todo acesso filtra por usuario_id.
+"""
+import io
+import os
+import csv
+import uuid
+import codecs
+import shutil
+import inspect
+import tempfile
+import threading
+import unicodedata
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import LRUCache
+
+from services import cache
+from services.api_tmdb import pesquisar_midia
+from services.api_rawg import pesquisar_jogos
+
+TABELA_ARQUIVOS = 'arquivos_nostalgia'
+TAMANHO_LOTE = 50          # Linhas resolvidas e gravadas por vez
+TAMANHO_PAGINA_EXPORT = 1000
+MAX_BUSCAS_PARALELAS = 8
+MAX_IMPORTACOES_SIMULTANEAS = 2
+TAMANHO_MEMO = 5000        # Títulos já resolvidos lembrados durante uma importação
+TTL_IMPORTACAO = 24 * 60 * 60  # Por quanto tempo o andamento de uma importação pode ser consultado
+
+# As buscas da importação não passam pelo cache compartilhado: milhares de títulos de uma vez
+# tirariam de lá as listas que o agendador mantém quentes
+_pesquisar_midia = inspect.unwrap(pesquisar_midia)
+_pesquisar_jogos = inspect.unwrap(pesquisar_jogos)
+
+_executor_importacoes = ThreadPoolExecutor(max_workers=MAX_IMPORTACOES_SIMULTANEAS, thread_name_prefix='importacao')
+
+COLUNAS_EXPORT = ['titulo', 'tipo', 'ano', 'midia_id', 'poster_url', 'comentario']
+
+# Nomes de coluna aceitos em planilhas (normalizados sem acento e em minúsculas)
+_ALIASES_COLUNAS = {
+    'titulo': 'titulo', 'title': 'titulo', 'nome': 'titulo', 'name': 'titulo',
+    'tipo': 'tipo', 'type': 'tipo', 'midia': 'tipo',
+    'ano': 'ano', 'year': 'ano', 'lancamento': 'ano',
+    'comentario': 'comentario', 'comentarios': 'comentario', 'nota pessoal': 'comentario', 'obs': 'comentario',
+}
+
+_ALIASES_TIPOS = {
+    'filme': 'movie', 'filmes': 'movie', 'movie': 'movie',
+    'serie': 'tv', 'series': 'tv', 'tv': 'tv', 'desenho': 'tv', 'desenhos': 'tv',
+    'jogo': 'game', 'jogos': 'game', 'game': 'game', 'games': 'game',
+}
+
+def _normalizar(texto):
+    """Minúsculas, sem acentos e sem espaços nas pontas."""
+    texto = unicodedata.normalize('NFKD', str(texto or '').strip().lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+def _ano(data):
+    return data[:4] if data else ''
+
+def _detectar_codificacao(arquivo_binario):
+    """
+    'utf-8-sig' se o arquivo inteiro for UTF-8 válido; senão 'cp1252', a codificação do
+    "CSV (separado por ponto e vírgula)" do Excel em pt-BR. Lê em blocos e volta ao início.
+    """
+    if not arquivo_binario.seekable():
+        return 'utf-8-sig'
+
+    inicio = arquivo_binario.tell()
+    decodificador = codecs.getincrementaldecoder('utf-8')()
+    try:
+        for bloco in iter(lambda: arquivo_binario.read(64 * 1024), b''):
+            decodificador.decode(bloco)
+        decodificador.decode(b'', final=True)
+        return 'utf-8-sig'
+    except UnicodeDecodeError:
+        return 'cp1252'
+    finally:
+        arquivo_binario.seek(inicio)
+
+def ler_linhas(arquivo_binario):
+    """
+    Gera as linhas do CSV uma a uma como dicionários com chaves padronizadas
+    (titulo, tipo, ano, comentario). Aceita separador ',' ou ';' e arquivos em UTF-8
+    ou Windows-1252 (os dois como o Excel em pt-BR salva).
+    Levanta ValueError se não houver coluna de título.
+    """
+    # errors='replace': um byte inválido estraga um título, não a importação inteira
+    texto = io.TextIOWrapper(arquivo_binario, encoding=_detectar_codificacao(arquivo_binario),
+                             errors='replace', newline='')
+
+    primeira_linha = texto.readline()
+    delimitador = ';' if primeira_linha.count(';') > primeira_linha.count(',') else ','
+    cabecalho = next(csv.reader([primeira_linha], delimiter=delimitador), [])
+    colunas = [_ALIASES_COLUNAS.get(_normalizar(coluna)) for coluna in cabecalho]
+    if 'titulo' not in colunas:
+        raise ValueError("A planilha precisa de uma coluna 'titulo' (ou 'nome').")
+
+    for numero, valores in enumerate(csv.reader(texto, delimiter=delimitador), start=2):
+        linha = {coluna: valor.strip() for coluna, valor in zip(colunas, valores) if coluna}
+        if linha.get('titulo'):
+            linha['numero'] = numero
+            linha['tipo'] = _ALIASES_TIPOS.get(_normalizar(linha.get('tipo')))
+            yield linha
+
+def resolver_titulo(titulo, tipo=None, ano=''):
+    """
+    Encontra a mídia correspondente a um título da planilha.
+    Prefere o resultado do mesmo tipo e do mesmo ano. Retorna o item formatado ou None.
+    """
+    if tipo == 'game':
+        candidatos = _pesquisar_jogos(titulo)
+    else:
+        candidatos = [item for item in _pesquisar_midia(titulo) if item.get('tipo') in ('movie', 'tv')]
+        if tipo:
+            candidatos = [item for item in candidatos if item['tipo'] == tipo] or candidatos
+
+    if not candidatos:
+        return None
+
+    if ano:
+        mesmo_ano = [item for item in candidatos if _ano(item.get('data_lancamento')) == ano]
+        if mesmo_ano:
+            return mesmo_ano[0]
+
+    return candidatos[0]
+
+def _montar_registro(usuario_id, linha, midia):
+    return {
+        'usuario_id': usuario_id,
+        'midia_id': midia['id'],
+        'tipo': midia.get('tipo') or linha.get('tipo'),
+        'titulo': midia['titulo'],
+        'ano': _ano(midia.get('data_lancamento')) or linha.get('ano') or None,
+        'poster_url': midia.get('poster_url'),
+        'comentario': linha.get('comentario') or None,
+    }
+
+def importar_csv(supabase, usuario_id, arquivo_binario, max_nao_encontrados=50, ao_progredir=None):
+    """
+    Importa um CSV de títulos para o arquivo do usuário.
+
+    Args:
+        ao_progredir: função chamada com o resumo parcial depois de cada lote gravado
+
+    Returns:
+        Dicionário com o total de linhas lidas, quantos foram importados
+        e uma amostra das linhas que não foram encontradas.
+    """
+    resumo = {'linhas': 0, 'importados': 0, 'nao_encontrados': []}
+    linhas = ler_linhas(arquivo_binario)
+
+    # Títulos repetidos na planilha (ex: a mesma série em várias linhas) são buscados uma vez só
+    memo = LRUCache(maxsize=TAMANHO_MEMO)
+    lock_memo = threading.Lock()
+
+    def resolver(linha):
+        chave = (_normalizar(linha['titulo']), linha.get('tipo'), linha.get('ano', '')[:4])
+        with lock_memo:
+            if chave in memo:
+                return memo[chave]
+        try:
+            midia = resolver_titulo(linha['titulo'], linha.get('tipo'), linha.get('ano', '')[:4])
+        except Exception as e:
+            print(f"Erro ao resolver '{linha['titulo']}': {e}")
+            return None
+        with lock_memo:
+            memo[chave] = midia
+        return midia
+
+    with ThreadPoolExecutor(max_workers=MAX_BUSCAS_PARALELAS) as executor:
+        while True:
+            lote = list(islice(linhas, TAMANHO_LOTE))
+            if not lote:
+                break
+            resumo['linhas'] += len(lote)
+
+            registros = {}
+            for linha, midia in zip(lote, executor.map(resolver, lote)):
+                if midia:
+                    registro = _montar_registro(usuario_id, linha, midia)
+                    # A mesma mídia repetida no lote quebraria o upsert
+                    registros[(registro['midia_id'], registro['tipo'])] = registro
+                elif len(resumo['nao_encontrados']) < max_nao_encontrados:
+                    resumo['nao_encontrados'].append({'linha': linha['numero'], 'titulo': linha['titulo']})
+
+            if registros:
+                supabase.table(TABELA_ARQUIVOS).upsert(
+                    list(registros.values()),
+                    on_conflict='usuario_id,midia_id,tipo'
+                ).execute()
+                resumo['importados'] += len(registros)
+
+            if ao_progredir:
+                ao_progredir(resumo)
+
+    return resumo
+
+def _chave_importacao(id_importacao):
+    return f"importacao:{id_importacao}"
+
+def _executar_importacao(supabase, estado, caminho):
+    def salvar_estado(resumo=None):
+        if resumo:
+            estado.update(resumo)
+        cache.salvar(_chave_importacao(estado['id']), estado, TTL_IMPORTACAO)
+
+    try:
+        with open(caminho, 'rb') as arquivo:
+            salvar_estado(importar_csv(supabase, estado['usuario_id'], arquivo, ao_progredir=salvar_estado))
+        estado['status'] = 'concluido'
+    except (ValueError, csv.Error) as e:
+        # Problema na própria planilha: a mensagem é útil para quem enviou
+        print(f"Erro ao importar CSV {estado['id']}: {e}")
+        estado['status'] = 'erro'
+        estado['erro'] = f"Arquivo inválido: {e}"
+    except Exception as e:
+        print(f"Erro ao importar CSV {estado['id']}: {e}")
+        estado['status'] = 'erro'
+        estado['erro'] = 'Erro ao gravar o arquivo. Tente de novo mais tarde.'
+    finally:
+        os.remove(caminho)
+        salvar_estado()
+
+def iniciar_importacao(supabase, usuario_id, arquivo_binario):
+    """
+    Copia o arquivo enviado para o disco e importa em segundo plano, para que a requisição
+    termine na hora (planilhas grandes levariam minutos por causa dos limites das APIs).
+
+    Returns:
+        ID da importação, usado em estado_importacao para acompanhar o andamento.
+    """
+    temporario = tempfile.NamedTemporaryFile(prefix='importacao_', suffix='.csv', delete=False)
+    with temporario:
+        shutil.copyfileobj(arquivo_binario, temporario)
+
+    estado = {
+        'id': uuid.uuid4().hex,
+        'usuario_id': usuario_id,
+        'status': 'processando',
+        'linhas': 0,
+        'importados': 0,
+        'nao_encontrados': [],
+    }
+    cache.salvar(_chave_importacao(estado['id']), estado, TTL_IMPORTACAO)
+    _executor_importacoes.submit(_executar_importacao, supabase, dict(estado), temporario.name)
+    return estado['id']
+
+def estado_importacao(id_importacao, usuario_id):
+    """
+    Andamento de uma importação: status ('processando', 'concluido' ou 'erro'), linhas lidas,
+    importados e amostra dos não encontrados; com status 'erro', o motivo em 'erro'.
+    None se não existir ou for de outro usuário.
+    """
+    estado = cache.obter(_chave_importacao(id_importacao))
+    if not estado or estado.get('usuario_id') != usuario_id:
+        return None
+    return {chave: valor for chave, valor in estado.items() if chave != 'usuario_id'}
+
+def exportar_csv(supabase, usuario_id):
+    """
+    Gerador com o CSV do arquivo do usuário, lido do Supabase em páginas.
+    Cada item gerado é um pedaço de texto pronto para ser enviado ao navegador.
+    """
+    buffer = io.StringIO()
+    escritor = csv.DictWriter(buffer, fieldnames=COLUNAS_EXPORT, extrasaction='ignore')
+
+    def descarregar():
+        conteudo = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return conteudo
+
+    escritor.writeheader()
+    yield descarregar()
+
+    inicio = 0
+    while True:
+        resposta = (
+            supabase.table(TABELA_ARQUIVOS)
+            .select(','.join(COLUNAS_EXPORT))
+            .eq('usuario_id', usuario_id)
+            .order('id')
+            .range(inicio, inicio + TAMANHO_PAGINA_EXPORT - 1)
+            .execute()
+        )
+        registros = resposta.data or []
+        if not registros:
+            break
+
+        escritor.writerows(registros)
+        yield descarregar()
+
+        if len(registros) < TAMANHO_PAGINA_EXPORT:
+            break
+        inicio += TAMANHO_PAGINA_EXPORT
@@ -0,0 +1,93 @@
+import base64
+import zlib
+
+# IDs guardados no cursor: os das últimas ~10 páginas do TMDB, que é onde a mudança
+# na ordem de popularidade gera repetidos. Sem limite o token passaria do tamanho
+# máximo de URL do gunicorn (4094 bytes) depois de umas 25 páginas.
+MAX_IDS_CURSOR = 200
+
+# Tamanho máximo do token já descomprimido: a página e até MAX_IDS_CURSOR varints de
+# até 5 bytes. O token vem do cliente; sem o limite, poucos KB viram milhões de IDs.
+MAX_BYTES_CURSOR = MAX_IDS_CURSOR * 5 + 10
+
+def _escrever_varint(numero, saida):
+    """Escreve um inteiro não negativo em formato varint (7 bits por byte)."""
+    while True:
+        byte = numero & 0x7F
+        numero >>= 7
+        if numero:
+            saida.append(byte | 0x80)
+        else:
+            saida.append(byte)
+            return
+
+def _ler_varints(dados):
+    """Lê todos os varints de uma sequência de bytes."""
+    numeros = []
+    numero = 0
+    deslocamento = 0
+    for byte in dados:
+        numero |= (byte & 0x7F) << deslocamento
+        if byte & 0x80:
+            deslocamento += 7
+        else:
+            numeros.append(numero)
+            numero = 0
+            deslocamento = 0
+    return numeros
+
+def codificar_cursor(proxima_pagina, ids_vistos):
+    """
+    Gera um token compacto com a próxima página do TMDB e os IDs que o cliente já recebeu.
+
+    `ids_vistos` vem na ordem em que os itens foram enviados; só os MAX_IDS_CURSOR mais
+    recentes entram no token. Eles são guardados como diferenças entre vizinhos (varint
+    zigzag, já que a diferença pode ser negativa), comprimidos com zlib e codificados
+    em base64 para URL. Com o limite, o token fica abaixo de ~1 KB.
+    """
+    saida = bytearray()
+    _escrever_varint(proxima_pagina, saida)
+
+    anterior = 0
+    for id_item in list(dict.fromkeys(ids_vistos))[-MAX_IDS_CURSOR:]:
+        diferenca = id_item - anterior
+        # Zigzag: 0, -1, 1, -2... -> 0, 1, 2, 3...
+        _escrever_varint(diferenca * 2 if diferenca >= 0 else -diferenca * 2 - 1, saida)
+        anterior = id_item
+
+    comprimido = zlib.compress(bytes(saida), 9)
+    return base64.urlsafe_b64encode(comprimido).decode('ascii').rstrip('=')
+
+def decodificar_cursor(token, ultima_pagina=None):
+    """
+    Lê um token gerado por codificar_cursor.
+    Retorna (proxima_pagina, lista de IDs vistos na ordem em que foram enviados).
+    Token vazio, inválido ou maior do que codificar_cursor geraria volta para a página 1.
+    Com `ultima_pagina`, a página devolvida nunca passa dela.
+    """
+    if not token:
+        return 1, []
+
+    try:
+        preenchimento = '=' * (-len(token) % 4)
+        descompressor = zlib.decompressobj()
+        dados = descompressor.decompress(base64.urlsafe_b64decode(token + preenchimento), MAX_BYTES_CURSOR)
+        if descompressor.unconsumed_tail:
+            return 1, []
+        numeros = _ler_varints(dados)
+    except (ValueError, zlib.error):
+        return 1, []
+
+    if not numeros:
+        return 1, []
+
+    ids_vistos = []
+    atual = 0
+    for numero in numeros[1:]:
+        atual += numero // 2 if numero % 2 == 0 else -(numero + 1) // 2
+        ids_vistos.append(atual)
+
+    pagina = max(numeros[0], 1)
+    if ultima_pagina is not None:
+        pagina = min(pagina, ultima_pagina)
+    return pagina, ids_vistos[-MAX_IDS_CURSOR:]